@@ -1,57 +1,108 @@
-import google.generativeai as genai
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
 import os
 import time
 import random
+import logging
+import re
+import threading
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
+from semantic_cache import SemanticCache
 
 load_dotenv()
 
+log = logging.getLogger('outreach.ai')
+
+# Fallback emails used whenever Gemini is unavailable
+_FALLBACK_TEMPLATES = (
+    "Most scaling challenges feel like you're constantly putting out fires — but that's where the interesting engineering problems live. I'm Mantavya Mahajan, a Computer Science and Mathematics student at Penn State, currently working as a GenAI intern at Scale AI. I've been following your company's work in building robust infrastructure, and your approach to handling high-throughput systems really stands out. My experience with optimizing API performance (boosted throughput by 15% to 1,440 req/sec at M8) and building ML pipelines could be valuable as you scale. Here's some of my work: https://mantavya-mahajan-portfolio.vercel.app/. Would you be open to a quick chat about internship opportunities this summer, or even fall and full-time roles starting December 2025?",
+
+    "Building products that actually solve real problems is harder than it looks — most tools end up being clunky workarounds. I'm Mantavya Mahajan, a Computer Science and Mathematics student at Penn State, currently working as a GenAI intern at Scale AI. Your product's focus on user experience and technical elegance really caught my attention. With my background in full-stack development and AI systems (built multi-agent workflows reducing content creation time by 60%), I'd love to contribute to what you're building. Check out my work: https://mantavya-mahajan-portfolio.vercel.app/. Would you be open to a quick chat about summer internships or full-time opportunities starting December 2025?",
+
+    "Data pipelines that actually work reliably are surprisingly rare — yours seem to be the exception. I'm Mantavya Mahajan, a CS and Math student at Penn State, currently interning at Scale AI on GenAI systems. I've been impressed by your approach to handling large-scale data processing and your focus on reliability. My experience with building RAG systems, optimizing database performance, and working with real-time data processing could add value to your team. Here's my portfolio: https://mantavya-mahajan-portfolio.vercel.app/. Would you be interested in a quick chat about internship opportunities or full-time roles starting December 2025?",
+
+    "Most AI tools feel like black boxes wrapped in hype — but your approach to transparency and practical implementation is refreshing. I'm Mantavya Mahajan, a Computer Science and Mathematics student at Penn State, currently working as a GenAI intern at Scale AI. Your work on making AI actually useful for real business problems really resonates with me. With my experience in LLM optimization, building evaluation frameworks, and full-stack AI applications, I think I could contribute meaningfully to your mission. Check out my work: https://mantavya-mahajan-portfolio.vercel.app/. Would you be open to discussing summer internship or full-time opportunities starting December 2025?"
+)
+
+# Private generator so template picks don't contend on the module-level random lock
+_template_rng = random.Random()
+
+# Gemini only caches contents of at least this many tokens (32,768 for the 1.5 models)
+MIN_CACHED_TOKENS = int(os.getenv('GEMINI_CACHE_MIN_TOKENS', '32768'))
+# Context caching needs a pinned model version such as gemini-1.5-flash-002
+_VERSIONED_MODEL_RE = re.compile(r'-\d{3}$')
+
 class AIService:
     def __init__(self):
         self.api_keys = [
             os.getenv('GEMINI_API_KEY_1'),
             os.getenv('GEMINI_API_KEY_2')
         ]
-        self.current_key_index = 0
-        self.models = []
+        # Short outreach emails don't need the larger model; GEMINI_MODEL switches back if quality drops
+        self.model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash-8b')
+        self.generation_config = types.GenerateContentConfig(
+            max_output_tokens=400,
+            temperature=0.7,
+            candidate_count=1
+        )
+        
+        # Keys are load-balanced: each request goes to the least busy key that isn't rate limited
+        self.key_pool = []
+        self._pool_lock = threading.Lock()
         
-        # Initialize models for both keys
+        # One isolated client per key (genai.configure was global, so the last key silently won)
         for key in self.api_keys:
             if key:
                 try:
-                    genai.configure(api_key=key)
-                    model = genai.GenerativeModel('gemini-1.5-flash')
-                    self.models.append(model)
-                    print(f"✅ Gemini API key initialized: {key[:10]}...")
+                    client = genai.Client(api_key=key)
+                    self.key_pool.append({
+                        'index': len(self.key_pool) + 1,
+                        'client': client,
+                        'in_flight': 0,
+                        'cooldown_until': 0,
+                        'req_count': 0
+                    })
+                    log.info("Gemini API key initialized: %s...", key[:10])
                 except Exception as e:
-                    print(f"❌ Failed to initialize Gemini key {key[:10]}...: {e}")
+                    log.error("Failed to initialize Gemini key %s...: %s", key[:10], e)
         
-        if not self.models:
-            print("❌ No Gemini API keys working!")
-    
-    def get_predefined_templates(self):
-        """Fallback templates when AI fails"""
-        templates = [
-            "Most scaling challenges feel like you're constantly putting out fires — but that's where the interesting engineering problems live. I'm Mantavya Mahajan, a Computer Science and Mathematics student at Penn State, currently working as a GenAI intern at Scale AI. I've been following your company's work in building robust infrastructure, and your approach to handling high-throughput systems really stands out. My experience with optimizing API performance (boosted throughput by 15% to 1,440 req/sec at M8) and building ML pipelines could be valuable as you scale. Here's some of my work: https://mantavya-mahajan-portfolio.vercel.app/. Would you be open to a quick chat about internship opportunities this summer, or even fall and full-time roles starting December 2025?",
-            
-            "Building products that actually solve real problems is harder than it looks — most tools end up being clunky workarounds. I'm Mantavya Mahajan, a Computer Science and Mathematics student at Penn State, currently working as a GenAI intern at Scale AI. Your product's focus on user experience and technical elegance really caught my attention. With my background in full-stack development and AI systems (built multi-agent workflows reducing content creation time by 60%), I'd love to contribute to what you're building. Check out my work: https://mantavya-mahajan-portfolio.vercel.app/. Would you be open to a quick chat about summer internships or full-time opportunities starting December 2025?",
-            
-            "Data pipelines that actually work reliably are surprisingly rare — yours seem to be the exception. I'm Mantavya Mahajan, a CS and Math student at Penn State, currently interning at Scale AI on GenAI systems. I've been impressed by your approach to handling large-scale data processing and your focus on reliability. My experience with building RAG systems, optimizing database performance, and working with real-time data processing could add value to your team. Here's my portfolio: https://mantavya-mahajan-portfolio.vercel.app/. Would you be interested in a quick chat about internship opportunities or full-time roles starting December 2025?",
-            
-            "Most AI tools feel like black boxes wrapped in hype — but your approach to transparency and practical implementation is refreshing. I'm Mantavya Mahajan, a Computer Science and Mathematics student at Penn State, currently working as a GenAI intern at Scale AI. Your work on making AI actually useful for real business problems really resonates with me. With my experience in LLM optimization, building evaluation frameworks, and full-stack AI applications, I think I could contribute meaningfully to your mission. Check out my work: https://mantavya-mahajan-portfolio.vercel.app/. Would you be open to discussing summer internship or full-time opportunities starting December 2025?"
-        ]
-        return random.choice(templates)
-    
-    def generate_personalized_paragraph(self, resume_content="", job_description=""):
-        """Generate personalized paragraph with AI fallbacks"""
+        if not self.key_pool:
+            log.error("No Gemini API keys working!")
         
-        if not self.models:
-            return self.get_predefined_templates()
+        # Circuit breaker: after `threshold` failures within `window` seconds skip Gemini entirely for
+        # `cooldown` seconds, then let a single probe request decide whether to close again
+        self._breaker = {'state': 'CLOSED', 'failures': deque(), 'open_until': 0, 'probe_started': 0,
+                         'threshold': 5, 'window': 60, 'cooldown': 60}
+        self._breaker_lock = threading.Lock()
         
-        if not resume_content or not job_description:
-            return self.get_predefined_templates()
+        # Upload the static part of the prompt once so each call only sends the company info
+        self._prompt_prefix = self._build_prompt_prefix()
+        # Inline fallback prompt: static text first, only the company info varies
+        self._prompt_head = self._prompt_prefix + "COMPANY INFO:\n"
+        self._prompt_tail = "\n\nGenerate the complete email following this structure. Keep it conversational and specific to their company/role:"
+        # Cached contents belong to the key that created them, so the cache is always used through key 1
+        self.cached_prefix = None
+        self._cache_client = self.key_pool[0]['client'] if self.key_pool else None
+        if self.key_pool and self._prefix_cacheable():
+            self._create_prompt_cache()
+        
+        # Keep the resume in memory; load_resume re-reads it only when the file changes
+        self._resume_path = "resume.txt"
+        self.resume_content, self._resume_mtime = self._read_resume(self._resume_path)
+        
+        # Reuse emails generated for near-identical job descriptions
+        self.semantic_cache = SemanticCache()
         
-        prompt = f"""You are writing a cold outreach email for Mantavya Mahajan to a tech company. Follow this EXACT structure and tone:
+        # Exact-match LRU in front of it: previews and re-runs with the same description skip the embedding call too
+        self._email_cache = OrderedDict()
+        self._email_cache_size = 256
+        self._email_cache_lock = threading.Lock()
+    
+    def _build_prompt_prefix(self):
+        """Static instructions shared by every outreach email"""
+        return """You are writing a cold outreach email for Mantavya Mahajan to a tech company. Follow this EXACT structure and tone:
 
 STRUCTURE (6-8 sentences total):
 1. **Hook**: One short, witty sentence about their product/industry pain point
@@ -70,42 +121,320 @@ RESUME HIGHLIGHTS TO USE:
 - Projects: Meal Plan Optimizer (5,000+ transactions), EPU Index (50,000+ headlines)
 - Skills: Python, AI/ML, full-stack development, system optimization
 
-COMPANY INFO:
-{job_description}
-
-Generate the complete email following this structure. Keep it conversational and specific to their company/role:"""
+"""
+    
+    def _prefix_cacheable(self):
+        """Whether Gemini would accept the prefix as cached content; checked locally to save a failing call"""
+        if not _VERSIONED_MODEL_RE.search(self.model_name):
+            log.info("Prompt caching skipped: %s is not a versioned model", self.model_name)
+            return False
+        # Roughly four characters per token
+        if len(self._prompt_prefix) // 4 < MIN_CACHED_TOKENS:
+            log.info("Prompt caching skipped: prefix is below Gemini's %d token minimum", MIN_CACHED_TOKENS)
+            return False
+        return True
+    
+    def _create_prompt_cache(self):
+        """Create (or recreate) the Gemini context cache for the static prompt prefix"""
+        try:
+            self.cached_prefix = self._cache_client.caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(
+                    contents=[self._prompt_prefix],
+                    ttl='1800s'
+                )
+            )
+            log.info("Gemini prompt prefix cached")
+        except Exception as e:
+            log.warning("Prompt caching unavailable, using inline prompts: %s", e)
+            self.cached_prefix = None
+    
+    def _generate_with_cached_prefix(self, job_description):
+        """Generate using the cached prefix on key 1, recreating the cache once if it expired.
+        Returns None on other errors so the caller falls back to the key pool."""
+        entry = self.key_pool[0]
+        user_turn = f"COMPANY INFO:\n{job_description}\n\nGenerate the email:"
+        for _ in range(2):
+            # Key 1 goes through the same accounting as the pool, so a benched key is left alone
+            with self._pool_lock:
+                if entry['cooldown_until'] > time.time():
+                    return None
+                entry['in_flight'] += 1
+                entry['req_count'] += 1
+            cooldown = 0
+            try:
+                config = self.generation_config.model_copy(
+                    update={'cached_content': self.cached_prefix.name}
+                )
+                return self._stream_text(self._cache_client, user_turn, config)
+            except genai_errors.APIError as e:
+                if e.code == 429:
+                    cooldown = self._retry_after_seconds(e) or self._backoff_delay(0, 0.5, 30)
+                    log.warning("Gemini key 1 rate limited, cooling down %.0fs", cooldown)
+                    return None
+                # Only a missing or expired cache is worth recreating
+                if e.code != 404 and 'expire' not in str(e).lower():
+                    log.warning("Cached prompt failed: %s", e)
+                    return None
+                log.info("Cached prompt expired, recreating it")
+            finally:
+                self._release_model(entry, cooldown)
+            self._create_prompt_cache()
+            if not self.cached_prefix:
+                return None
+        return None
+    
+    def _stream_text(self, client, contents, config=None):
+        """Stream a completion, stopping early once it has clearly drifted from the template"""
+        chunks = []
+        length = 0
+        intro_seen = False
+        stream = client.models.generate_content_stream(
+            model=self.model_name,
+            contents=contents,
+            config=config or self.generation_config
+        )
+        for chunk in stream:
+            text = chunk.text or ""
+            chunks.append(text)
+            length += len(text)
+            if not intro_seen and length > 600:
+                # The intro is sentence two; if it hasn't appeared by now the email won't pass the quality check
+                intro_seen = "Mantavya Mahajan" in "".join(chunks)
+                if not intro_seen:
+                    log.debug("Generated email diverged from the template, stopping early")
+                    return ""
+        return "".join(chunks).strip()
+    
+    def _acquire_model(self):
+        """Pick the key that is not cooling down, has the fewest requests in flight and the fewest total"""
+        with self._pool_lock:
+            now = time.time()
+            entry = min(self.key_pool, key=lambda k: (k['cooldown_until'] > now, k['in_flight'], k['req_count']))
+            if entry['cooldown_until'] > now:
+                return None  # Every key is rate limited
+            entry['in_flight'] += 1
+            entry['req_count'] += 1
+            return entry
+    
+    def _release_model(self, entry, cooldown=0):
+        """Return a key to the pool, optionally benching it after a rate limit"""
+        with self._pool_lock:
+            entry['in_flight'] -= 1
+            if cooldown:
+                entry['cooldown_until'] = max(entry['cooldown_until'], time.time() + cooldown)
+    
+    def _breaker_allows_request(self):
+        """False while the breaker is open; after the cooldown exactly one caller gets through as the probe"""
+        with self._breaker_lock:
+            breaker = self._breaker
+            now = time.time()
+            if breaker['state'] == 'CLOSED':
+                return True
+            if breaker['state'] == 'OPEN':
+                if now < breaker['open_until']:
+                    return False
+                breaker['state'] = 'HALF_OPEN'
+                log.info("Gemini circuit HALF_OPEN - probing")
+            elif now - breaker['probe_started'] < breaker['cooldown']:
+                # A probe is in flight; everyone else waits for its outcome
+                return False
+            # A probe that never reported back (e.g. answered from the cache) is replaced after a cooldown
+            breaker['probe_started'] = now
+            return True
+    
+    def _breaker_record_failure(self):
+        with self._breaker_lock:
+            breaker = self._breaker
+            now = time.time()
+            failures = breaker['failures']
+            failures.append(now)
+            # Only failures inside the sliding window count towards tripping
+            while failures and now - failures[0] > breaker['window']:
+                failures.popleft()
+            if breaker['state'] == 'HALF_OPEN' or len(failures) >= breaker['threshold']:
+                breaker['state'] = 'OPEN'
+                breaker['open_until'] = now + breaker['cooldown']
+                failures.clear()
+                log.warning("Gemini circuit OPEN - using templates for %ss", breaker['cooldown'])
+    
+    def _breaker_record_success(self):
+        with self._breaker_lock:
+            breaker = self._breaker
+            if breaker['state'] != 'CLOSED':
+                log.info("Gemini circuit CLOSED")
+            breaker['state'] = 'CLOSED'
+            breaker['failures'].clear()
+    
+    @staticmethod
+    def _retry_after_seconds(error, default=None):
+        """Read the server's RetryInfo delay (e.g. "30s") from a 429 error response"""
+        details = getattr(error, 'details', None)
+        if not isinstance(details, dict):
+            return default
+        for detail in details.get('error', {}).get('details', []):
+            retry_delay = detail.get('retryDelay') if isinstance(detail, dict) else None
+            if retry_delay:
+                try:
+                    return float(str(retry_delay).rstrip('s'))
+                except ValueError:
+                    return default
+        return default
+    
+    @staticmethod
+    def _backoff_delay(attempt, base, cap):
+        """Exponential backoff with jitter"""
+        return min(cap, base * 2 ** attempt) + random.uniform(0, base)
+    
+    def get_predefined_templates(self):
+        """Fallback templates when AI fails"""
+        return _template_rng.choice(_FALLBACK_TEMPLATES)
+    
+    def generate_personalized_paragraph(self, resume_content="", job_description=""):
+        """Generate personalized paragraph with AI fallbacks"""
+        
+        if not self.key_pool:
+            return self.get_predefined_templates()
+        
+        if not resume_content or not job_description:
+            return self.get_predefined_templates()
+        
+        cache_key = (resume_content, job_description)
+        with self._email_cache_lock:
+            cached_email = self._email_cache.get(cache_key)
+            if cached_email:
+                self._email_cache.move_to_end(cache_key)
+                return cached_email
+        
+        if not self._breaker_allows_request():
+            return self.get_predefined_templates()
+        
+        embedding = self._embed(job_description)
+        cached_email = self.semantic_cache.lookup(embedding)
+        if cached_email:
+            self._remember_email(cache_key, cached_email)
+            return cached_email
+        
+        generated_email = self._generate_with_gemini(job_description)
+        if generated_email:
+            self.semantic_cache.store(embedding, generated_email)
+            self._remember_email(cache_key, generated_email)
+            return generated_email
+        
+        log.warning("All AI services failed, using predefined template")
+        return self.get_predefined_templates()
+    
+    def _embed(self, text):
+        """Embed a job description on the least busy key; None if no key is free or the call fails"""
+        entry = self._acquire_model()
+        if entry is None:
+            return None
+        cooldown = 0
+        try:
+            return self.semantic_cache.embed(text, entry['client'])
+        except genai_errors.APIError as e:
+            if e.code == 429:
+                cooldown = self._retry_after_seconds(e) or self._backoff_delay(0, 0.5, 30)
+            log.warning("Embedding failed on key %s, skipping semantic cache: %s", entry['index'], e)
+            return None
+        except Exception as e:
+            log.warning("Embedding failed on key %s, skipping semantic cache: %s", entry['index'], e)
+            return None
+        finally:
+            self._release_model(entry, cooldown)
+    
+    def _remember_email(self, cache_key, email):
+        with self._email_cache_lock:
+            self._email_cache[cache_key] = email
+            self._email_cache.move_to_end(cache_key)
+            if len(self._email_cache) > self._email_cache_size:
+                self._email_cache.popitem(last=False)
+    
+    def generate_personalized_email(self, resume_content, job_description, company_name):
+        """Generate the subject and body shared by every recipient at a company"""
+        return {
+            'subject': company_name,
+            'body': self.generate_personalized_paragraph(resume_content, job_description)
+        }
+    
+    def _generate_with_gemini(self, job_description):
+        """Call Gemini for a new email, returning None if every key fails"""
+        prompt = self._prompt_head + job_description + self._prompt_tail
 
+        if self.cached_prefix:
+            try:
+                generated_email = self._generate_with_cached_prefix(job_description)
+                if generated_email:
+                    if len(generated_email) > 200 and "Mantavya Mahajan" in generated_email:  # Quality check
+                        log.debug("AI email generated successfully (cached prefix)")
+                        return generated_email
+            except Exception as e:
+                log.warning("Cached prompt generation failed: %s", e)
+        
         # Try each model/key
-        for attempt in range(len(self.models)):
+        for attempt in range(len(self.key_pool)):
+            entry = self._acquire_model()
+            if entry is None:
+                log.warning("All Gemini keys are rate limited")
+                break
+            
+            cooldown = 0
+            delay = 0
             try:
-                model = self.models[self.current_key_index]
-                print(f"🧠 Trying Gemini API key {self.current_key_index + 1}...")
+                log.debug("Trying Gemini API key %s...", entry['index'])
                 
-                response = model.generate_content(prompt)
-                if response and response.text:
-                    generated_email = response.text.strip()
+                generated_email = self._stream_text(entry['client'], prompt)
+                self._breaker_record_success()
+                if generated_email:
                     if len(generated_email) > 200 and "Mantavya Mahajan" in generated_email:  # Quality check
-                        print("✅ AI email generated successfully")
+                        log.debug("AI email generated successfully")
                         return generated_email
                 
+            except genai_errors.APIError as e:
+                if e.code == 429:
+                    # Bench this key for the server's retry delay; the next attempt goes to another key
+                    cooldown = self._retry_after_seconds(e) or self._backoff_delay(attempt, 0.5, 30)
+                    log.warning("Gemini key %s rate limited, cooling down %.0fs", entry['index'], cooldown)
+                else:
+                    delay = self._backoff_delay(attempt, 0.25, 4)
+                    log.warning("Gemini key %s failed: %s", entry['index'], e)
+                self._breaker_record_failure()
             except Exception as e:
-                print(f"⚠️ Gemini key {self.current_key_index + 1} failed: {e}")
-                
-            # Switch to next key
-            self.current_key_index = (self.current_key_index + 1) % len(self.models)
-            time.sleep(1)  # Brief delay before retry
+                # Transient errors (network blips, 5xx) get a short backoff
+                delay = self._backoff_delay(attempt, 0.25, 4)
+                log.warning("Gemini key %s failed: %s", entry['index'], e)
+                self._breaker_record_failure()
+            finally:
+                self._release_model(entry, cooldown)
+            
+            if delay and attempt < len(self.key_pool) - 1:
+                time.sleep(delay)
         
-        print("⚠️ All AI services failed, using predefined template")
-        return self.get_predefined_templates()
+        return None
     
-    def load_resume(self, resume_path="resume.txt"):
-        """Load resume content from file"""
+    def _read_resume(self, resume_path):
+        """Read resume content and its modification time from disk"""
         try:
+            mtime = os.path.getmtime(resume_path)
             with open(resume_path, "r", encoding="utf-8") as f:
-                return f.read().strip()
+                return f.read().strip(), mtime
         except FileNotFoundError:
-            print(f"❌ Resume file not found: {resume_path}")
-            return ""
+            log.error("Resume file not found: %s", resume_path)
+            return "", None
         except Exception as e:
-            print(f"❌ Error loading resume: {e}")
-            return ""
\ No newline at end of file
+            log.error("Error loading resume: %s", e)
+            return "", None
+    
+    def load_resume(self, resume_path="resume.txt"):
+        """Load resume content, re-reading the file only when it has changed"""
+        if resume_path != self._resume_path:
+            return self._read_resume(resume_path)[0]
+        
+        try:
+            mtime = os.path.getmtime(resume_path)
+        except OSError:
+            mtime = None
+        
+        if mtime != self._resume_mtime:
+            self.resume_content, self._resume_mtime = self._read_resume(resume_path)
+        return self.resume_content
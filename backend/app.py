@@ -1,38 +1,164 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sqlite3
 import threading
 import time
 import os
 from dotenv import load_dotenv
 
+try:
+    # orjson is much cheaper than json for the polled campaign lists; the output is the same
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import our services
 from ai_service import AIService
 from email_service import EmailService
 from linkedin_service import LinkedInService
-from email_scraper import EmailScraper
+from email_scraper import BrowserPool
 
 load_dotenv()
 
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line so logs can be grepped and shipped as-is"""
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def _configure_logging():
+    """Route 'outreach' logs through a queue so request and campaign threads never block on stdout"""
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonLogFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # flush queued records on shutdown
+    
+    logger = logging.getLogger('outreach')
+    logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+    return listener
+
+_log_listener = _configure_logging()
+log = logging.getLogger('outreach.app')
+
 app = Flask(__name__)
 CORS(app)
 
 # Global services
 ai_service = AIService()
 email_service = EmailService()
-linkedin_service = LinkedInService()
-email_scraper = EmailScraper()
+linkedin_service = LinkedInService(headless=os.getenv('LINKEDIN_HEADLESS') == '1')
+atexit.register(linkedin_service.close)  # the LinkedIn browser is reused across campaigns
+# Concurrent campaigns and bulk scrapes use up to SCRAPER_WORKERS Chrome instances, each started on first use
+email_scraper = BrowserPool(size=int(os.getenv('SCRAPER_WORKERS', '2')))
+atexit.register(email_scraper.shutdown)  # the scrapers keep their browsers open between campaigns
+
+# Recent campaign results are kept in memory (bounded, oldest evicted first);
+# finished campaigns are also written to SQLite so they survive restarts
+MAX_CAMPAIGN_RESULTS = 1000
+CAMPAIGNS_DB = 'campaigns.db'
+
+campaign_results = OrderedDict()
+_results_lock = threading.RLock()
+_persist_queue = queue.Queue()
+
+def _init_campaign_db():
+    """Create the campaigns table and return the next free campaign id"""
+    conn = sqlite3.connect(CAMPAIGNS_DB)
+    try:
+        conn.execute('CREATE TABLE IF NOT EXISTS campaigns (id INTEGER PRIMARY KEY, json TEXT)')
+        conn.commit()
+        max_id = conn.execute('SELECT MAX(id) FROM campaigns').fetchone()[0]
+        return (max_id or 0) + 1
+    finally:
+        conn.close()
+
+def _campaign_writer():
+    """Background thread that upserts finished campaigns into SQLite"""
+    conn = sqlite3.connect(CAMPAIGNS_DB)
+    while True:
+        result = _persist_queue.get()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO campaigns (id, json) VALUES (?, ?)',
+                (result['id'], json.dumps(result))
+            )
+            conn.commit()
+        except Exception as e:
+            log.error("Failed to persist campaign %s: %s", result.get('id'), e)
+
+def _load_campaign(campaign_id):
+    """Look up a campaign that is no longer held in memory"""
+    conn = sqlite3.connect(CAMPAIGNS_DB)
+    try:
+        row = conn.execute('SELECT json FROM campaigns WHERE id = ?', (campaign_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    finally:
+        conn.close()
+
+campaign_counter = _init_campaign_db()
+_counter_lock = threading.Lock()
+threading.Thread(target=_campaign_writer, daemon=True).start()
+
+# Campaigns run on a bounded pool instead of one new thread per request
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='campaign')
+
+def _update_result(result, **fields):
+    """Set fields on a live campaign result while readers may be serializing it"""
+    with _results_lock:
+        result.update(fields)
+
+def _add_result_error(result, message):
+    with _results_lock:
+        result['errors'].append(message)
 
-# Simple in-memory storage for results
-campaign_results = []
-campaign_counter = 1
+def _snapshot(result):
+    """Copy of a campaign result that is safe to serialize outside the lock"""
+    with _results_lock:
+        return dict(result, errors=list(result['errors']))
 
-def run_campaign_async(campaign_data):
+# raw domain -> (clean domain, company name), shared across campaigns
+_domain_cache = {}
+_domain_cache_lock = threading.Lock()
+
+def _domain_info(domain):
+    with _domain_cache_lock:
+        info = _domain_cache.get(domain)
+    if info is None:
+        clean_domain = email_scraper.clean_domain(domain)
+        info = (clean_domain, clean_domain.split('.')[0].title() if clean_domain else None)
+        with _domain_cache_lock:
+            _domain_cache.setdefault(domain, info)
+    return info
+
+def _next_campaign_id():
+    """Allocate a campaign id (safe across concurrent requests)"""
+    global campaign_counter
+    with _counter_lock:
+        campaign_id = campaign_counter
+        campaign_counter += 1
+    return campaign_id
+
+def run_campaign_async(campaign_data, campaign_id):
     """Run the outreach campaign in background"""
-    global campaign_counter, campaign_results
-    
-    campaign_id = campaign_counter
-    campaign_counter += 1
-    
     # Initialize result
     result = {
         'id': campaign_id,
@@ -44,7 +170,10 @@ def run_campaign_async(campaign_data):
         'errors': []
     }
     
-    campaign_results.append(result)
+    with _results_lock:
+        campaign_results[campaign_id] = result
+        if len(campaign_results) > MAX_CAMPAIGN_RESULTS:
+            campaign_results.popitem(last=False)
     
     try:
         domain = campaign_data['domain']
@@ -53,17 +182,15 @@ def run_campaign_async(campaign_data):
         email_enabled = campaign_data.get('email_enabled', True)
         linkedin_enabled = campaign_data.get('linkedin_enabled', True)
         
-        print(f"\n🚀 Starting campaign {campaign_id} for {domain}")
+        log.info("Starting campaign %s for %s", campaign_id, domain)
         
         # Get company name for messaging
-        clean_domain = email_scraper.clean_domain(domain)
+        clean_domain, company_name = _domain_info(domain)
         if not clean_domain:
-            result['status'] = 'failed'
-            result['errors'].append('Invalid domain')
+            _update_result(result, status='failed')
+            _add_result_error(result, 'Invalid domain')
             return
         
-        company_name = clean_domain.split('.')[0].title()
-        
         # Load resume and generate personalized content
         resume_content = ai_service.load_resume()
         personalized_email = ai_service.generate_personalized_paragraph(
@@ -73,52 +200,44 @@ def run_campaign_async(campaign_data):
         # EMAIL OUTREACH
         if email_enabled:
             try:
-                print(f"📧 Starting email outreach for {company_name}...")
+                log.info("Starting email outreach for %s", company_name)
                 
                 # Find emails using our enhanced scraper with AI filtering
                 emails = email_scraper.find_emails(clean_domain)
-                result['emails_found'] = len(emails)
+                _update_result(result, emails_found=len(emails))
                 
                 if emails:
-                    print(f"✅ Found {len(emails)} real people emails")
+                    log.info("Found %d real people emails", len(emails))
                     
-                    # Send emails to found contacts
-                    emails_sent = 0
-                    for email in emails[:target_email_count]:
-                        try:
-                            # Generate personalized email using AI
-                            personalized_content = ai_service.generate_personalized_email(
-                                resume_content, job_description, company_name, email
-                            )
-                            
-                            subject = f"Software Engineer Opportunity - {personalized_content.get('subject', 'Partnership Inquiry')}"
-                            body = personalized_content.get('body', personalized_email)
-                            
-                            # Send email
-                            if email_service.send_email(email, subject, body):
-                                emails_sent += 1
-                                print(f"   ✅ Email sent to {email}")
-                                time.sleep(2)  # Rate limiting
-                            else:
-                                print(f"   ❌ Failed to send email to {email}")
-                                
-                        except Exception as e:
-                            print(f"   ❌ Error sending to {email}: {e}")
-                            continue
+                    # The body depends only on the job description, so one generated email goes to every recipient
+                    personalized_content = ai_service.generate_personalized_email(
+                        resume_content, job_description, company_name
+                    )
+                    subject = f"Software Engineer Opportunity - {personalized_content.get('subject', 'Partnership Inquiry')}"
+                    body = personalized_content.get('body', personalized_email)
+                    outgoing = [(email, subject, body) for email in emails[:target_email_count]]
                     
-                    result['emails_sent'] = emails_sent
-                    print(f"📧 Email campaign complete: {emails_sent}/{len(emails)} sent")
+                    send_results = email_service.send_batch(outgoing)
+                    for (email, _, _), sent in zip(outgoing, send_results):
+                        if sent:
+                            log.debug("Email sent to %s", email)
+                        else:
+                            log.debug("Failed to send email to %s", email)
+                    emails_sent = sum(send_results)
+                    
+                    _update_result(result, emails_sent=emails_sent)
+                    log.info("Email campaign complete: %d/%d sent", emails_sent, len(emails))
                 else:
-                    print("❌ No emails found for outreach")
+                    log.warning("No emails found for outreach")
                     
             except Exception as e:
-                print(f"❌ Email outreach failed: {e}")
-                result['errors'].append(f'Email error: {str(e)}')
+                log.error("Email outreach failed: %s", e)
+                _add_result_error(result, f'Email error: {str(e)}')
         
         # LINKEDIN OUTREACH
         if linkedin_enabled:
             try:
-                print(f"\n🔗 Starting LinkedIn outreach for {company_name}...")
+                log.info("Starting LinkedIn outreach for %s", company_name)
                 
                 # Use the emails we found to search for people on LinkedIn
                 target_emails = emails[:10] if emails else []  # Use first 10 emails
@@ -128,42 +247,135 @@ def run_campaign_async(campaign_data):
                         target_emails, company_name, max_connections=5
                     )
                     
-                    result['linkedin_people_found'] = len(linkedin_results)
-                    result['linkedin_connections_sent'] = sum(1 for r in linkedin_results if r.get('connected'))
+                    _update_result(
+                        result,
+                        linkedin_people_found=len(linkedin_results),
+                        linkedin_connections_sent=sum(1 for r in linkedin_results if r.get('connected'))
+                    )
                     
-                    print(f"🔗 LinkedIn campaign complete: {result['linkedin_connections_sent']} connections sent")
+                    log.info("LinkedIn campaign complete: %s connections sent", result['linkedin_connections_sent'])
                 else:
-                    print("❌ No email data available for LinkedIn search")
+                    log.warning("No email data available for LinkedIn search")
                     
             except Exception as e:
-                print(f"❌ LinkedIn outreach failed: {e}")
-                result['errors'].append(f'LinkedIn error: {str(e)}')
+                log.error("LinkedIn outreach failed: %s", e)
+                _add_result_error(result, f'LinkedIn error: {str(e)}')
         
         # Update final status
-        if result['emails_sent'] > 0 or result.get('linkedin_connections_sent', 0) > 0:
-            result['status'] = 'completed'
-        else:
-            result['status'] = 'failed'
-            
-        result['completed_at'] = time.time()
-        print(f"\n✅ Campaign {campaign_id} completed!")
-        print(f"   📧 Emails: {result['emails_sent']}/{result['emails_found']}")
-        print(f"   🔗 LinkedIn: {result.get('linkedin_connections_sent', 0)}/{result.get('linkedin_people_found', 0)}")
+        succeeded = result['emails_sent'] > 0 or result.get('linkedin_connections_sent', 0) > 0
+        _update_result(result, status='completed' if succeeded else 'failed', completed_at=time.time())
+        log.info(
+            "Campaign %s completed: emails %s/%s, linkedin %s/%s",
+            campaign_id, result['emails_sent'], result['emails_found'],
+            result.get('linkedin_connections_sent', 0), result.get('linkedin_people_found', 0)
+        )
         
     except Exception as e:
-        print(f"❌ Campaign {campaign_id} failed: {e}")
-        result['status'] = 'failed'
-        result['errors'].append(str(e))
+        log.error("Campaign %s failed: %s", campaign_id, e)
+        _update_result(result, status='failed')
+        _add_result_error(result, str(e))
+    finally:
+        _persist_queue.put(_snapshot(result))
+
+# Bulk scrape jobs are only kept in memory (bounded like campaign_results)
+scrape_jobs = OrderedDict()
+scrape_counter = 1
+# Batch-filtered jobs can wait on Gemini for hours, so they get their own workers instead of the campaign pool
+_scrape_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='scrape')
+
+def _next_scrape_id():
+    global scrape_counter
+    with _counter_lock:
+        job_id = scrape_counter
+        scrape_counter += 1
+    return job_id
+
+def run_scrape_async(domains, job_id, batch=False):
+    """Find emails for a list of domains in background"""
+    job = {
+        'id': job_id,
+        'domains': domains,
+        'batch': batch,
+        'status': 'running',
+        'results': {},
+        'errors': []
+    }
+    
+    with _results_lock:
+        scrape_jobs[job_id] = job
+        if len(scrape_jobs) > MAX_CAMPAIGN_RESULTS:
+            scrape_jobs.popitem(last=False)
+    
+    try:
+        log.info("Starting bulk scrape %s for %d domains", job_id, len(domains))
+        results = email_scraper.find_emails_bulk(domains, batch=batch)
+        _update_result(job, status='completed', results=results, completed_at=time.time())
+        log.info("Bulk scrape %s completed: %d emails", job_id, sum(len(emails) for emails in results.values()))
+    except Exception as e:
+        log.error("Bulk scrape %s failed: %s", job_id, e)
+        _update_result(job, status='failed')
+        _add_result_error(job, str(e))
+
+class ValidationError(ValueError):
+    """Raised when a request body doesn't match its schema"""
+
+_REQUIRED = object()
+
+# Request schemas: field -> (expected type, default). Built once at import time.
+LAUNCH_SCHEMA = {
+    'domain': (str, _REQUIRED),
+    'target_email_count': (int, 5),
+    'job_description': (str, ''),
+    # Channels are opt-in, as before validation was added: a request enabling neither is rejected
+    'email_enabled': (bool, False),
+    'linkedin_enabled': (bool, False),
+}
+TEST_EMAIL_SCHEMA = {'email': (str, _REQUIRED)}
+TEST_SCRAPER_SCHEMA = {'domain': (str, _REQUIRED)}
+SCRAPE_SCHEMA = {
+    'domains': (list, _REQUIRED),
+    # Filter through the Gemini Batch API: half price, but results can take hours
+    'batch': (bool, False),
+}
+
+def _validate_json(schema):
+    """Parse the request body once and return it checked against the schema, defaults filled in"""
+    data = request.get_json(silent=True, cache=True)
+    if not isinstance(data, dict):
+        raise ValidationError("Request body must be a JSON object")
+
+    validated = {}
+    for field, (expected, default) in schema.items():
+        value = data.get(field)
+        if value is None or value == '':
+            if default is _REQUIRED:
+                raise ValidationError(f"{field} is required")
+            validated[field] = default
+            continue
+        # bool is a subclass of int, so reject it explicitly for int fields
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValidationError(f"{field} must be of type {expected.__name__}")
+        validated[field] = value
+    return validated
+
+def _json(payload):
+    """JSON response, serialized with orjson when it is installed"""
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload, ensure_ascii=False)
+    return Response(body, mimetype='application/json')
+
+@app.errorhandler(ValidationError)
+def handle_validation_error(error):
+    return _json({"error": str(error)}), 400
 
 # API Routes
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return _json({
         "status": "healthy",
         "message": "Cold Outreach API is running",
         "services": {
-            "ai": len(ai_service.models) > 0,
+            "ai": len(ai_service.key_pool) > 0,
             "email": len(email_service.email_providers) > 0,
             "linkedin": bool(linkedin_service.linkedin_email)
         }
@@ -172,47 +384,48 @@ def health_check():
 @app.route('/api/launch', methods=['POST'])
 def launch_campaign():
     """Launch a new outreach campaign"""
+    data = _validate_json(LAUNCH_SCHEMA)
     try:
-        data = request.json
-        
-        # Validation
-        if not data or not data.get('domain'):
-            return jsonify({"error": "Domain is required"}), 400
-        
-        if not data.get('email_enabled') and not data.get('linkedin_enabled'):
-            return jsonify({"error": "At least one outreach method must be enabled"}), 400
+        if not data['email_enabled'] and not data['linkedin_enabled']:
+            return _json({"error": "At least one outreach method must be enabled"}), 400
         
         # Start campaign in background
-        campaign_thread = threading.Thread(target=run_campaign_async, args=(data,))
-        campaign_thread.daemon = True
-        campaign_thread.start()
+        campaign_id = _next_campaign_id()
+        _executor.submit(run_campaign_async, data, campaign_id)
         
-        return jsonify({
+        return _json({
             "success": True,
             "message": "Campaign launched successfully",
-            "campaign_id": campaign_counter - 1
+            "campaign_id": campaign_id
         })
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/api/campaigns', methods=['GET'])
 def get_campaigns():
     """Get all campaign results"""
-    return jsonify({
+    with _results_lock:
+        campaigns = [_snapshot(c) for c in campaign_results.values()]
+    return _json({
         "success": True,
-        "campaigns": campaign_results
+        "campaigns": campaigns
     })
 
 @app.route('/api/campaigns/<int:campaign_id>', methods=['GET'])
 def get_campaign(campaign_id):
     """Get specific campaign result"""
-    campaign = next((c for c in campaign_results if c['id'] == campaign_id), None)
+    with _results_lock:
+        campaign = campaign_results.get(campaign_id)
+        if campaign is not None:
+            campaign = _snapshot(campaign)
+    if campaign is None:
+        campaign = _load_campaign(campaign_id)
     
     if not campaign:
-        return jsonify({"error": "Campaign not found"}), 404
+        return _json({"error": "Campaign not found"}), 404
     
-    return jsonify({
+    return _json({
         "success": True,
         "campaign": campaign
     })
@@ -231,24 +444,19 @@ def test_email_connection():
                 'success': test_result
             })
         
-        return jsonify({
+        return _json({
             "success": True,
             "connection_tests": results
         })
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/api/test-email', methods=['POST'])
 def test_email():
     """Test email sending"""
+    test_email = _validate_json(TEST_EMAIL_SCHEMA)['email']
     try:
-        data = request.json
-        test_email = data.get('email')
-        
-        if not test_email:
-            return jsonify({"error": "Email address required"}), 400
-        
         # Send test email
         success = email_service.send_email(
             test_email,
@@ -256,28 +464,23 @@ def test_email():
             "This is a test email to verify email configuration is working."
         )
         
-        return jsonify({
+        return _json({
             "success": success,
             "message": "Test email sent" if success else "Test email failed"
         })
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/api/test-scraper', methods=['POST'])
 def test_scraper():
     """Test email scraping"""
+    domain = _validate_json(TEST_SCRAPER_SCHEMA)['domain']
     try:
-        data = request.json
-        domain = data.get('domain')
-        
-        if not domain:
-            return jsonify({"error": "Domain required"}), 400
-        
         # Test scraping
         emails = email_scraper.find_emails(domain)
         
-        return jsonify({
+        return _json({
             "success": True,
             "domain": domain,
             "emails_found": len(emails),
@@ -285,7 +488,43 @@ def test_scraper():
         })
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
+
+@app.route('/api/scrape', methods=['POST'])
+def launch_scrape():
+    """Find emails for several domains in one background job"""
+    data = _validate_json(SCRAPE_SCHEMA)
+    domains = data['domains']
+    if not all(isinstance(domain, str) for domain in domains):
+        raise ValidationError("domains must be a list of strings")
+    try:
+        job_id = _next_scrape_id()
+        _scrape_executor.submit(run_scrape_async, domains, job_id, data['batch'])
+        
+        return _json({
+            "success": True,
+            "message": "Scrape job started",
+            "job_id": job_id
+        })
+        
+    except Exception as e:
+        return _json({"error": str(e)}), 500
+
+@app.route('/api/scrape/<int:job_id>', methods=['GET'])
+def get_scrape(job_id):
+    """Get a bulk scrape job's status and emails per domain"""
+    with _results_lock:
+        job = scrape_jobs.get(job_id)
+        if job is not None:
+            job = _snapshot(job)
+    
+    if not job:
+        return _json({"error": "Scrape job not found"}), 404
+    
+    return _json({
+        "success": True,
+        "job": job
+    })
 
 @app.route('/api/test-email-template', methods=['POST'])
 def test_email_template():
@@ -304,7 +543,7 @@ def test_email_template():
         # Create subject
         subject = f"Quick question about opportunities at {company_name}"
         
-        return jsonify({
+        return _json({
             "success": True,
             "subject": subject,
             "body": personalized_email,
@@ -315,7 +554,7 @@ def test_email_template():
         })
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 if __name__ == '__main__':
     print("🚀 Starting Cold Outreach API Server...")
@@ -327,13 +566,16 @@ if __name__ == '__main__':
     print("   - POST /api/test-email-connection - Test email connections")
     print("   - POST /api/test-email - Test email sending")
     print("   - POST /api/test-scraper - Test email scraping")
+    print("   - POST /api/scrape - Find emails for several domains")
+    print("   - GET  /api/scrape/<id> - Get a scrape job's emails")
     print("   - POST /api/test-email-template - Test new email template")
     
     # Check service health on startup
     print("\n🔍 Checking services...")
-    print(f"   AI Service: {'✅' if len(ai_service.models) > 0 else '❌'} ({len(ai_service.models)} keys)")
+    print(f"   AI Service: {'✅' if len(ai_service.key_pool) > 0 else '❌'} ({len(ai_service.key_pool)} keys)")
     print(f"   Email Service: {'✅' if len(email_service.email_providers) > 0 else '❌'} ({len(email_service.email_providers)} providers)")
     print(f"   LinkedIn Service: {'✅' if linkedin_service.linkedin_email else '❌'}")
     
+    # Production serving goes through gunicorn (see wsgi.py); FLASK_DEBUG=1 turns on the debugger and reloader
     print("\n🌟 Server starting...")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true'), host='0.0.0.0', port=5000)
\ No newline at end of file
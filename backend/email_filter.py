@@ -1,68 +1,31 @@
 """
 AI-powered email filtering service to identify real people vs customer support/HR emails
 """
+import asyncio
+import fnmatch
+import hashlib
+import itertools
+import json
+import logging
 import os
+import random
 import re
-from typing import List, Dict
-import google.generativeai as genai
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Optional, Tuple
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
+from email_filter_core import FilterResult, extract_name_from_local, fallback_filter, is_support_local
 
-class EmailFilter:
-    def __init__(self):
-        """Initialize AI email filter with Gemini API"""
-        try:
-            # Get API keys from environment
-            api_key1 = os.getenv('GEMINI_API_KEY')
-            api_key2 = os.getenv('GEMINI_API_KEY_2')
-            
-            if not api_key1 and not api_key2:
-                raise Exception("No Gemini API keys found in environment")
-            
-            # Use first available key
-            api_key = api_key1 if api_key1 else api_key2
-            genai.configure(api_key=api_key)
-            
-            # Initialize model
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-            print("✅ Email filter AI initialized")
-            
-        except Exception as e:
-            print(f"❌ Email filter initialization failed: {e}")
-            self.model = None
-    
-    def filter_emails(self, emails: List[str], company_domain: str) -> Dict:
-        """
-        Filter emails to identify real people vs support/HR/generic emails
-        
-        Args:
-            emails: List of email addresses
-            company_domain: The company domain being searched
-            
-        Returns:
-            Dict with 'real_people', 'support_emails', and 'analysis'
-        """
-        if not self.model:
-            print("❌ AI model not available, returning all emails")
-            return {
-                'real_people': emails,
-                'support_emails': [],
-                'analysis': 'AI filtering not available'
-            }
-        
-        if not emails:
-            return {
-                'real_people': [],
-                'support_emails': [],
-                'analysis': 'No emails to filter'
-            }
-        
-        print(f"🤖 AI filtering {len(emails)} emails for {company_domain}...")
-        
-        try:
-            # Create prompt for AI analysis
-            email_list = "\n".join([f"- {email}" for email in emails])
-            
-            prompt = f"""
-Analyze these email addresses from {company_domain} and:
+log = logging.getLogger('outreach.email_filter')
+
+# Static parts of the filtering prompt; only the domain and email list change per call
+_PROMPT_INTRO = """
+Analyze these email addresses from """
+
+_PROMPT_HEADER = """ and:
 1. Categorize them into REAL PEOPLE vs SUPPORT/GENERIC emails
 2. Extract the actual NAMES from the real people emails
 
@@ -91,181 +54,467 @@ For REAL PEOPLE emails, extract the likely full name from the email address:
 IMPORTANT: Break concatenated names appropriately and capitalize properly.
 
 Email addresses to analyze:
-{email_list}
+"""
 
-Respond in this exact JSON format:
-{{
-    "real_people": [
-        {{"email": "john.smith@company.com", "name": "John Smith"}},
-        {{"email": "sarah.j@company.com", "name": "Sarah J"}}
-    ],
-    "support_emails": ["support@company.com", "hr@company.com"],
-    "analysis": "Brief explanation of filtering decisions"
-}}
+_PROMPT_FOOTER = """
+
+Put every address in exactly one of real_people or support_emails, and briefly explain your filtering decisions in analysis.
 """
+
+# JSON mode: Gemini returns exactly this shape, so the reply can be passed straight to json.loads
+_RESPONSE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'real_people': {
+            'type': 'ARRAY',
+            'items': {
+                'type': 'OBJECT',
+                'properties': {
+                    'email': {'type': 'STRING'},
+                    'name': {'type': 'STRING'}
+                },
+                'required': ['email', 'name']
+            }
+        },
+        'support_emails': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'analysis': {'type': 'STRING'}
+    },
+    'required': ['real_people', 'support_emails', 'analysis']
+}
+
+# Attempts per filter request; rate limits move to the next key, server errors back off and retry
+_MAX_ATTEMPTS = 3
+
+# firstname.lastname@ - unambiguous enough to name without the model
+_FIRST_LAST_RE = re.compile(r'^[a-z]+\.[a-z]+@')
+
+_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': _RESPONSE_SCHEMA
+}
+
+class EmailFilter:
+    def __init__(self):
+        """Initialize AI email filter with Gemini API"""
+        try:
+            # Get API keys from environment (.env names the first key GEMINI_API_KEY_1)
+            api_keys = [
+                os.getenv('GEMINI_API_KEY') or os.getenv('GEMINI_API_KEY_1'),
+                os.getenv('GEMINI_API_KEY_2')
+            ]
+            api_keys = [key for key in dict.fromkeys(api_keys) if key]
             
-            # Get AI response
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+            if not api_keys:
+                raise Exception("No Gemini API keys found in environment")
+            
+            # One client per key, handed out round-robin so both keys' quotas are used
+            # Each client keeps its HTTP connection pool, so repeated calls reuse the TLS session
+            self.clients = [
+                genai.Client(api_key=key, http_options=types.HttpOptions(timeout=30_000))
+                for key in api_keys
+            ]
+            self._client_cycle = itertools.cycle(self.clients)
+            self._cycle_lock = threading.Lock()
+            # Batch jobs are owned by the key that created them, so they always use the first client
+            self.client = self.clients[0]
+            self.model = 'gemini-1.5-flash'
+            log.info("Email filter AI initialized (%d keys)", len(self.clients))
             
-            # Try to parse JSON from response
+        except Exception as e:
+            log.error("Email filter initialization failed: %s", e)
+            self.clients = []
+            self.client = None
+            self.model = None
+        
+        # Exact-match cache of AI results, so re-filtering the same domain and emails skips Gemini
+        self.cache_ttl = 7 * 24 * 3600
+        self.cache_path = 'filter_cache.db'
+        self.cache_exclude_patterns = [
+            pattern.strip().lower()
+            for pattern in os.getenv('EMAIL_FILTER_CACHE_EXCLUDE', '').split(',')
+            if pattern.strip()
+        ]
+        try:
+            conn = sqlite3.connect(self.cache_path)
             try:
-                import json
-                # Extract JSON from response (in case there's extra text)
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                if json_start != -1 and json_end != -1:
-                    json_text = response_text[json_start:json_end]
-                    result = json.loads(json_text)
-                    
-                    # Extract emails and names from the new format
-                    real_people_data = result.get('real_people', [])
-                    if real_people_data and isinstance(real_people_data[0], dict):
-                        # New format with names
-                        emails_list = [person['email'] for person in real_people_data]
-                        names_list = [person['name'] for person in real_people_data]
-                        
-                        print(f"✅ AI identified {len(emails_list)} real people with names")
-                        print(f"   👤 People: {', '.join(names_list[:3])}{'...' if len(names_list) > 3 else ''}")
-                        print(f"   📧 Emails: {emails_list[:3]}{'...' if len(emails_list) > 3 else ''}")
-                        print(f"   🤖 Support emails: {len(result.get('support_emails', []))}")
-                        
-                        # Return in new format with names
-                        return {
-                            'real_people': real_people_data,  # List of {email, name} dicts
-                            'support_emails': result.get('support_emails', []),
-                            'analysis': result.get('analysis', ''),
-                            'emails_only': emails_list,  # For backward compatibility
-                            'names_only': names_list      # Easy access to names
-                        }
-                    else:
-                        # Old format fallback
-                        print(f"✅ AI identified {len(real_people_data)} real people")
-                        print(f"   📧 Real people: {real_people_data[:3]}{'...' if len(real_people_data) > 3 else ''}")
-                        print(f"   🤖 Support emails: {len(result.get('support_emails', []))}")
-                        
-                        return result
-                else:
-                    raise Exception("No JSON found in response")
-                    
-            except Exception as parse_error:
-                print(f"⚠️ Could not parse AI response: {parse_error}")
-                print(f"Raw response: {response_text[:200]}...")
-                
+                conn.execute('CREATE TABLE IF NOT EXISTS filter_cache (key TEXT PRIMARY KEY, result TEXT, created REAL)')
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            log.warning("Email filter cache unavailable: %s", e)
+            self.cache_path = None
+    
+    def _cache_key(self, emails: List[str], company_domain: str):
+        """Content hash of the domain and its (order-independent) email set, or None if this domain isn't cached"""
+        if not self.cache_path:
+            return None
+        domain = company_domain.lower()
+        if any(fnmatch.fnmatch(domain, pattern) for pattern in self.cache_exclude_patterns):
+            return None
+        normalized = company_domain + "|" + "\n".join(sorted(e.lower() for e in emails))
+        return hashlib.sha256(normalized.encode()).hexdigest()
+    
+    def _cache_get(self, key):
+        if key is None:
+            return None
+        try:
+            conn = sqlite3.connect(self.cache_path)
+            try:
+                row = conn.execute('SELECT result, created FROM filter_cache WHERE key = ?', (key,)).fetchone()
+            finally:
+                conn.close()
+            if row and time.time() - row[1] < self.cache_ttl:
+                return FilterResult.from_dict(json.loads(row[0]))
+        except Exception as e:
+            log.warning("Email filter cache read failed: %s", e)
+        return None
+    
+    def _cache_set(self, key, result: FilterResult):
+        if key is None:
+            return
+        try:
+            conn = sqlite3.connect(self.cache_path)
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO filter_cache (key, result, created) VALUES (?, ?, ?)',
+                    (key, json.dumps(result.to_dict()), time.time())
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            log.warning("Email filter cache write failed: %s", e)
+    
+    def _next_client(self):
+        with self._cycle_lock:
+            return next(self._client_cycle)
+    
+    @staticmethod
+    def _is_retryable(error):
+        """Rate limits (429) and transient server errors (5xx, e.g. 503) are worth another attempt"""
+        return isinstance(error, genai_errors.APIError) and (error.code == 429 or error.code >= 500)
+    
+    @staticmethod
+    def _retry_delay(attempt):
+        """Exponential backoff (1s, 2s, 4s... capped at 10s) with jitter"""
+        return min(10, 2 ** attempt) + random.uniform(0, 0.5)
+    
+    def _generate(self, prompt: str):
+        """Generate on the next key, retrying rate limits and server errors with backoff"""
+        attempts = max(_MAX_ATTEMPTS, len(self.clients))
+        for attempt in range(attempts):
+            client = self._next_client()
+            try:
+                return client.models.generate_content(model=self.model, contents=prompt, config=_GENERATION_CONFIG)
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == attempts - 1:
+                    raise
+                delay = self._retry_delay(attempt)
+                log.warning("Email filter request failed (%s), retrying in %.1fs", e.code, delay)
+                time.sleep(delay)
+    
+    async def _generate_async(self, prompt: str):
+        """Async _generate"""
+        attempts = max(_MAX_ATTEMPTS, len(self.clients))
+        for attempt in range(attempts):
+            client = self._next_client()
+            try:
+                return await client.aio.models.generate_content(
+                    model=self.model, contents=prompt, config=_GENERATION_CONFIG
+                )
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == attempts - 1:
+                    raise
+                delay = self._retry_delay(attempt)
+                log.warning("Email filter request failed (%s), retrying in %.1fs", e.code, delay)
+                await asyncio.sleep(delay)
+    
+    def _build_prompt(self, emails: List[str], company_domain: str) -> str:
+        """Build the categorization prompt for one domain's emails"""
+        email_list = "- " + "\n- ".join(emails) if emails else ""
+        return "".join([_PROMPT_INTRO, company_domain, _PROMPT_HEADER, email_list, _PROMPT_FOOTER])
+    
+    @staticmethod
+    def _dedupe(emails: List[str]) -> List[str]:
+        """Drop repeated addresses (case-insensitive), keeping the first spelling and the input order"""
+        unique = {}
+        for email in emails:
+            unique.setdefault(email.lower(), email)
+        return list(unique.values())
+    
+    @staticmethod
+    def _prescreen(emails: List[str]) -> Tuple[List[str], List[str]]:
+        """Split off addresses the support rules classify on their own; only the rest need the LLM"""
+        support_emails = []
+        ambiguous = []
+        for email in emails:
+            local_part, at, _ = email.lower().partition('@')
+            (support_emails if at and is_support_local(local_part) else ambiguous).append(email)
+        return support_emails, ambiguous
+    
+    def _rule_only_result(self, support_emails: List[str], ambiguous: List[str]):
+        """Result built without the LLM when the pre-screen leaves nothing it needs to decide (else None)"""
+        if not ambiguous:
+            real_people = []
+        elif len(ambiguous) == 1 and _FIRST_LAST_RE.match(ambiguous[0].lower()):
+            email = ambiguous[0]
+            real_people = [{"email": email, "name": extract_name_from_local(email.lower().split('@')[0])}]
+        else:
+            return None
+        
+        return FilterResult(
+            real_people,
+            support_emails,
+            f'Rule-only: {len(real_people)} people, {len(support_emails)} support emails (nothing ambiguous)'
+        )
+    
+    def _parse_response(self, response_text: str, emails: List[str], company_domain: str,
+                        prescreened_support: List[str] = ()) -> Optional[FilterResult]:
+        """Turn the model's JSON answer into a filter result (None if it can't be parsed)"""
+        try:
+            result = json.loads(response_text)
+            real_people_data = result['real_people']
+            emails_list = [person['email'] for person in real_people_data]
+            names_list = [person['name'] for person in real_people_data]
+        except (ValueError, KeyError, TypeError) as parse_error:
+            log.warning("Could not parse AI response: %s (raw response: %.200s)", parse_error, response_text)
+            return None
+        
+        # Per-domain detail; at the default INFO level these aren't formatted at all
+        log.debug("AI identified %d real people with names, %d support emails",
+                  len(emails_list), len(result.get('support_emails', [])))
+        log.debug("People: %s", names_list[:3])
+        
+        return FilterResult(
+            real_people_data,
+            list(prescreened_support) + result.get('support_emails', []),
+            result.get('analysis', '')
+        )
+    
+    def filter_emails(self, emails: List[str], company_domain: str) -> FilterResult:
+        """
+        Filter emails to identify real people vs support/HR/generic emails
+        
+        Args:
+            emails: List of email addresses
+            company_domain: The company domain being searched
+            
+        Returns:
+            FilterResult with real_people ({email, name} dicts), support_emails and analysis
+        """
+        if not self.model:
+            log.warning("AI model not available, returning all emails")
+            return FilterResult(
+                [{"email": email, "name": self._extract_name_from_email(email)} for email in emails],
+                [],
+                'AI filtering not available'
+            )
+        
+        if not emails:
+            return FilterResult([], [], 'No emails to filter')
+        
+        # Scraping several pages often returns the same address more than once; classify each once
+        emails = self._dedupe(emails)
+        
+        cache_key = self._cache_key(emails, company_domain)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            log.debug("Using cached filter result for %s", company_domain)
+            return cached
+        
+        support_emails, ambiguous = self._prescreen(emails)
+        rule_result = self._rule_only_result(support_emails, ambiguous)
+        if rule_result is not None:
+            return rule_result
+        log.debug("AI filtering %d emails for %s (%d pre-classified as support)", len(ambiguous), company_domain, len(support_emails))
+        
+        try:
+            prompt = self._build_prompt(ambiguous, company_domain)
+            
+            # Get AI response
+            response = self._generate(prompt)
+            result = self._parse_response(response.text, ambiguous, company_domain, support_emails)
+            if result is None:
                 # Fallback: simple rule-based filtering
                 return self._fallback_filter(emails, company_domain)
+            
+            self._cache_set(cache_key, result)
+            return result
                 
         except Exception as e:
-            print(f"❌ AI filtering failed: {e}")
+            log.error("AI filtering failed: %s", e)
             # Fallback to rule-based filtering
             return self._fallback_filter(emails, company_domain)
     
-    def _fallback_filter(self, emails: List[str], company_domain: str) -> Dict:
-        """Fallback rule-based filtering if AI fails"""
-        print("🔧 Using fallback rule-based filtering...")
+    async def filter_emails_async(self, emails: List[str], company_domain: str, semaphore=None) -> FilterResult:
+        """Async filter_emails: the Gemini call is awaited so many domains can be filtered concurrently"""
+        if not self.model:
+            return self.filter_emails(emails, company_domain)
         
-        # Common support/generic patterns
-        support_patterns = [
-            r'^(support|help|info|contact|customer|service)@',
-            r'^(hr|careers|jobs|recruiting|talent)@',
-            r'^(sales|marketing|admin|office)@',
-            r'^(noreply|donotreply|no-reply|automated)@',
-            r'^(webmaster|postmaster|mail|email)@',
-            r'^(billing|accounting|finance)@',
-            r'^(legal|compliance|security)@',
-            r'^(it|tech|system|server)@'
-        ]
+        if not emails:
+            return FilterResult([], [], 'No emails to filter')
         
-        real_people = []
-        support_emails = []
+        emails = self._dedupe(emails)
         
-        for email in emails:
-            email_lower = email.lower()
-            
-            # Check if it matches support patterns
-            is_support = any(re.match(pattern, email_lower) for pattern in support_patterns)
-            
-            if is_support:
-                support_emails.append(email)
-            else:
-                # Additional checks for real people
-                local_part = email_lower.split('@')[0]
-                
-                # Look for name-like patterns
-                has_name_pattern = (
-                    '.' in local_part or  # john.smith
-                    '_' in local_part or  # john_smith
-                    len(local_part) > 3   # longer names more likely to be real
-                )
-                
-                if has_name_pattern:
-                    # Extract name from email for fallback
-                    name = self._extract_name_from_email(email)
-                    real_people.append({"email": email, "name": name})
-                else:
-                    support_emails.append(email)
+        cache_key = self._cache_key(emails, company_domain)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            log.debug("Using cached filter result for %s", company_domain)
+            return cached
         
-        # Prepare return data
-        emails_list = [person["email"] for person in real_people]
-        names_list = [person["name"] for person in real_people]
+        support_emails, ambiguous = self._prescreen(emails)
+        rule_result = self._rule_only_result(support_emails, ambiguous)
+        if rule_result is not None:
+            return rule_result
+        log.debug("AI filtering %d emails for %s (%d pre-classified as support)", len(ambiguous), company_domain, len(support_emails))
         
-        return {
-            'real_people': real_people,
-            'support_emails': support_emails,
-            'analysis': f'Rule-based filtering: {len(real_people)} potential people, {len(support_emails)} support emails',
-            'emails_only': emails_list,
-            'names_only': names_list
-        }
-    
-    def _extract_name_from_email(self, email: str) -> str:
-        """Extract a likely name from an email address using simple rules"""
         try:
-            local_part = email.split('@')[0]
+            prompt = self._build_prompt(ambiguous, company_domain)
             
-            # Remove numbers and common suffixes
-            local_part = re.sub(r'\d+$', '', local_part)  # Remove trailing numbers
-            
-            # Handle different separators
-            if '.' in local_part:
-                # john.smith → John Smith
-                name_parts = local_part.split('.')
-            elif '_' in local_part:
-                # john_smith → John Smith  
-                name_parts = local_part.split('_')
+            if semaphore is None:
+                response = await self._generate_async(prompt)
             else:
-                # Try to split concatenated names intelligently
-                # Look for common patterns like camelCase or known name endings
-                name_parts = self._split_concatenated_name(local_part)
-            
-            # Capitalize each word
-            name = ' '.join(word.capitalize() for word in name_parts if word and len(word) > 1)
+                async with semaphore:
+                    response = await self._generate_async(prompt)
+            result = self._parse_response(response.text, ambiguous, company_domain, support_emails)
+            if result is None:
+                return self._fallback_filter(emails, company_domain)
             
-            return name if name else local_part.capitalize()
+            self._cache_set(cache_key, result)
+            return result
+        
+        except Exception as e:
+            log.error("AI filtering failed: %s", e)
+            return self._fallback_filter(emails, company_domain)
+    
+    async def filter_many(self, jobs: List[Tuple[List[str], str]], max_concurrency: int = 8) -> List[FilterResult]:
+        """
+        Filter several domains concurrently
+        
+        Args:
+            jobs: List of (emails, company_domain) pairs
+            max_concurrency: Maximum Gemini requests in flight, to stay under the QPS limit
             
-        except:
-            return email.split('@')[0].capitalize()
+        Returns:
+            Filter results in the same order as jobs
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results = await asyncio.gather(
+            *[self.filter_emails_async(emails, company_domain, semaphore) for emails, company_domain in jobs],
+            return_exceptions=True
+        )
+        return [
+            self._fallback_filter(emails, company_domain) if isinstance(result, Exception) else result
+            for (emails, company_domain), result in zip(jobs, results)
+        ]
     
-    def _split_concatenated_name(self, name: str) -> list:
-        """Split concatenated names like 'daveburnisonms' into ['dave', 'burnison', 'ms']"""
-        # Simple heuristic: split on common name patterns
-        # This is basic - the AI should do better
+    def filter_emails_batch(self, jobs: List[Tuple[str, List[str]]], chunk_size: int = 100,
+                            poll_interval: float = 30, timeout: float = 24 * 3600) -> Dict[str, FilterResult]:
+        """
+        Filter many domains through the Gemini Batch API (half price, asynchronous)
         
-        # Look for obvious patterns
-        name = name.lower()
+        Meant for bulk jobs that can wait; interactive callers should keep using filter_emails.
         
-        # Common name endings
-        if name.endswith('ms'):
-            return [name[:-2], 'ms']
-        elif name.endswith('jr'):
-            return [name[:-2], 'jr']
+        Args:
+            jobs: List of (company_domain, emails) pairs
+            chunk_size: Maximum requests per batch job
+            poll_interval: Seconds between job status checks
+            timeout: Give up on a batch job (and use rule-based filtering) after this many seconds
+            
+        Returns:
+            Dict mapping each company domain to its filter result
+        """
+        results = {}
+        pending = []
+        for company_domain, emails in jobs:
+            if not emails:
+                results[company_domain] = FilterResult([], [], 'No emails to filter')
+                continue
+            emails = self._dedupe(emails)
+            cached = self._cache_get(self._cache_key(emails, company_domain))
+            if cached is not None:
+                results[company_domain] = cached
+                continue
+            support_emails, ambiguous = self._prescreen(emails)
+            rule_result = self._rule_only_result(support_emails, ambiguous)
+            if rule_result is not None:
+                results[company_domain] = rule_result
+            else:
+                pending.append((company_domain, emails, support_emails, ambiguous))
         
-        # Try to find word boundaries (very basic)
-        # Split on vowel-consonant or consonant-vowel boundaries
-        import re
+        if not self.client:
+            for company_domain, emails, _, _ in pending:
+                results[company_domain] = self._fallback_filter(emails, company_domain)
+            return results
         
-        # Simple approach: assume max 2 parts for safety
-        if len(name) > 6:
-            mid = len(name) // 2
-            return [name[:mid], name[mid:]]
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            responses = self._run_batch_job(
+                [(company_domain, ambiguous) for company_domain, _, _, ambiguous in chunk], poll_interval, timeout
+            )
+            
+            for (company_domain, emails, support_emails, ambiguous), response_text in zip(chunk, responses):
+                result = None
+                if response_text:
+                    result = self._parse_response(response_text, ambiguous, company_domain, support_emails)
+                if result is None:
+                    results[company_domain] = self._fallback_filter(emails, company_domain)
+                else:
+                    self._cache_set(self._cache_key(emails, company_domain), result)
+                    results[company_domain] = result
         
-        return [name]
+        return results
+    
+    def _run_batch_job(self, chunk: List[Tuple[str, List[str]]], poll_interval: float, timeout: float) -> List:
+        """Submit one batch job and wait for it; returns response text per job (None where it failed)"""
+        try:
+            batch_job = self.client.batches.create(
+                model=self.model,
+                src=[
+                    {
+                        'contents': [{'parts': [{'text': self._build_prompt(emails, company_domain)}], 'role': 'user'}],
+                        'config': _GENERATION_CONFIG
+                    }
+                    for company_domain, emails in chunk
+                ],
+                config={'display_name': f'email-filter-{int(time.time())}'}
+            )
+            log.info("Submitted batch job %s for %d domains", batch_job.name, len(chunk))
+            
+            deadline = time.time() + timeout
+            done_states = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'}
+            while batch_job.state.name not in done_states:
+                if time.time() > deadline:
+                    log.warning("Batch job %s timed out, using rule-based filtering", batch_job.name)
+                    return [None] * len(chunk)
+                time.sleep(poll_interval)
+                batch_job = self.client.batches.get(name=batch_job.name)
+            
+            if batch_job.state.name != 'JOB_STATE_SUCCEEDED':
+                log.error("Batch job %s ended in %s", batch_job.name, batch_job.state.name)
+                return [None] * len(chunk)
+            
+            # Inline responses come back in request order
+            texts = []
+            for inline_response in batch_job.dest.inlined_responses:
+                if inline_response.response:
+                    texts.append(inline_response.response.text)
+                else:
+                    texts.append(None)
+            return texts + [None] * (len(chunk) - len(texts))
+            
+        except Exception as e:
+            log.error("Batch filtering failed: %s", e)
+            return [None] * len(chunk)
+    
+    def _fallback_filter(self, emails: List[str], company_domain: str) -> FilterResult:
+        """Fallback rule-based filtering if AI fails"""
+        log.info("Using fallback rule-based filtering")
+        return fallback_filter(emails)
+    
+    def _extract_name_from_email(self, email: str) -> str:
+        """Extract a likely name from an email address using simple rules"""
+        if '@' not in email:
+            return email.capitalize()
+        return extract_name_from_local(email.split('@', 1)[0])
@@ -0,0 +1,168 @@
+"""
+Rule-based email classification used when the AI filter is unavailable
+
+Kept free of I/O and third-party imports, with typed locals, so the whole module
+can be compiled with mypyc (mypyc email_filter_core.py) for the all-fallback case.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+try:
+    # google-re2 matches in linear time with no backtracking; plain re works the same, just slower
+    import re2 as _support_re_engine
+except ImportError:
+    _support_re_engine = re
+
+try:
+    # Unigram-frequency word segmentation; without it concatenated names use the halving heuristic
+    import wordninja
+except ImportError:
+    wordninja = None
+
+@dataclass
+class FilterResult:
+    """Outcome of filtering one domain's emails; the email/name views are derived on access"""
+    __slots__ = ('real_people', 'support_emails', 'analysis')
+    
+    real_people: List[Dict[str, str]]  # {email, name} dicts
+    support_emails: List[str]
+    analysis: str
+    
+    @property
+    def emails_only(self) -> List[str]:
+        return [person['email'] for person in self.real_people]
+    
+    @property
+    def names_only(self) -> List[str]:
+        return [person['name'] for person in self.real_people]
+    
+    def to_dict(self) -> Dict:
+        """The dict shape filter_emails used to return"""
+        return {
+            'real_people': self.real_people,
+            'support_emails': self.support_emails,
+            'analysis': self.analysis,
+            'emails_only': self.emails_only,
+            'names_only': self.names_only
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FilterResult':
+        return cls(data.get('real_people', []), data.get('support_emails', []), data.get('analysis', ''))
+
+# Local parts that always belong to a shared/support inbox (exact match, one set lookup)
+SUPPORT_LOCALS = frozenset({
+    'support', 'help', 'info', 'contact', 'customer', 'service',
+    'hr', 'careers', 'jobs', 'recruiting', 'talent',
+    'sales', 'marketing', 'admin', 'office',
+    'noreply', 'donotreply', 'no-reply', 'automated',
+    'webmaster', 'postmaster', 'mail', 'email',
+    'billing', 'accounting', 'finance',
+    'legal', 'compliance', 'security',
+    'it', 'tech', 'system', 'server'
+})
+
+# Automated senders with a suffix (no-reply-billing@, noreply+abc@) that the exact set can't catch
+_SUPPORT_TAIL_RE = _support_re_engine.compile(r'^(?:noreply|donotreply|no-reply)[-_.+]')
+
+# Common first names; a segmented local part only counts as a name when it starts with one
+FIRST_NAMES = frozenset({
+    'james', 'john', 'robert', 'michael', 'william', 'david', 'richard', 'thomas', 'charles', 'christopher',
+    'daniel', 'matthew', 'anthony', 'mark', 'donald', 'steven', 'paul', 'andrew', 'joshua', 'kenneth',
+    'mary', 'patricia', 'jennifer', 'linda', 'elizabeth', 'barbara', 'susan', 'jessica', 'sarah', 'karen',
+    'nancy', 'lisa', 'betty', 'helen', 'sandra', 'donna', 'carol', 'ruth', 'sharon', 'michelle',
+})
+
+def is_support_local(local_part: str) -> bool:
+    return local_part in SUPPORT_LOCALS or _SUPPORT_TAIL_RE.match(local_part) is not None
+
+@lru_cache(maxsize=8192)
+def split_concatenated_name(name: str) -> Tuple[str, ...]:
+    """Split concatenated names like 'daveburnisonms' into ('dave', 'burnison', 'ms')"""
+    # Simple heuristic: split on common name patterns
+    # This is basic - the AI should do better
+    
+    # Look for obvious patterns
+    name = name.lower()
+    
+    if wordninja is not None:
+        # wordninja splits on English word frequencies, so surnames come back as dictionary words
+        # ('burnison' -> 'burn is on'); only a known first name plus one more part is trusted
+        parts = tuple(wordninja.split(name))
+        if len(parts) == 2 and len(parts[1]) >= 2 and parts[0] in FIRST_NAMES:
+            return parts
+        return (name,)
+    
+    # Common name endings
+    if name.endswith('ms'):
+        return (name[:-2], 'ms')
+    elif name.endswith('jr'):
+        return (name[:-2], 'jr')
+    
+    # Try to find word boundaries (very basic)
+    # Split on vowel-consonant or consonant-vowel boundaries
+    
+    # Simple approach: assume max 2 parts for safety
+    if len(name) > 6:
+        mid: int = len(name) // 2
+        return (name[:mid], name[mid:])
+    
+    return (name,)
+
+@lru_cache(maxsize=8192)
+def extract_name_from_local(local_part: str) -> str:
+    """Name for an email local part (memoized: info@, sales@ and common names repeat across domains)"""
+    # Remove numbers and common suffixes
+    local_part = local_part.rstrip('0123456789')  # Remove trailing numbers
+    
+    name_parts: Tuple[str, ...]
+    # Handle different separators
+    if '.' in local_part:
+        # john.smith → John Smith
+        name_parts = tuple(local_part.split('.'))
+    elif '_' in local_part:
+        # john_smith → John Smith  
+        name_parts = tuple(local_part.split('_'))
+    else:
+        # Try to split concatenated names intelligently
+        # Look for common patterns like camelCase or known name endings
+        name_parts = split_concatenated_name(local_part)
+    
+    # Capitalize each word
+    name: str = ' '.join(word.capitalize() for word in name_parts if word and len(word) > 1)
+    
+    return name if name else local_part.capitalize()
+
+def fallback_filter(emails: List[str]) -> FilterResult:
+    """Classify emails into real people and support inboxes using rules only"""
+    real_people: List[Dict[str, str]] = []
+    support_emails: List[str] = []
+    
+    email: str
+    local_part: str
+    for email in emails:
+        # Lowercase and split each address once, then reuse the pieces
+        local_part, at, _ = email.lower().partition('@')
+        if not at:
+            continue  # Not an email address
+        
+        # Check if it matches support patterns
+        if is_support_local(local_part):
+            support_emails.append(email)
+            continue
+        
+        # Additional checks for real people
+        # Look for name-like patterns: john.smith, john_smith, or longer names (more likely to be real)
+        if '.' in local_part or '_' in local_part or len(local_part) > 3:
+            # Extract name from email for fallback
+            real_people.append({"email": email, "name": extract_name_from_local(local_part)})
+        else:
+            support_emails.append(email)
+    
+    return FilterResult(
+        real_people,
+        support_emails,
+        f'Rule-based filtering: {len(real_people)} potential people, {len(support_emails)} support emails'
+    )
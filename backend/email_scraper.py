@@ -1,6 +1,13 @@
+import asyncio
+import json
 import os
+import queue
+import threading
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -11,11 +18,108 @@ from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from email_filter import EmailFilter
 
+try:
+    # google-re2 scans large result pages in linear time; plain re gives the same matches, just slower
+    import re2 as _email_re_engine
+except ImportError:
+    _email_re_engine = re
+
+@lru_cache(maxsize=1024)
+def _clean_domain(domain_input):
+    domain = domain_input.strip().lower()
+    domain = domain.replace('https://', '').replace('http://', '').replace('www.', '')
+    domain = domain.split('/')[0]
+    
+    if '.' not in domain:
+        return None
+    
+    return domain
+
+# The manual-login profile holds the saved cookie file that every scraper profile is seeded from
+BASE_PROFILE = "chrome_profile_prospeo"
+_cookies_lock = threading.Lock()
+
+# chromedriver location, resolved at most once per process ('' = let Selenium Manager find one)
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+def chromedriver_path():
+    """Path to chromedriver; set CHROMEDRIVER_PATH to skip webdriver_manager's version lookup entirely"""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = os.getenv("CHROMEDRIVER_PATH", "")
+            if not _chromedriver_path:
+                try:
+                    _chromedriver_path = ChromeDriverManager().install()
+                except Exception as e:
+                    print(f"⚠️ webdriver_manager failed ({e}), falling back to Selenium Manager")
+        return _chromedriver_path
+
+# Prospeo's documented Domain Search API; only used when PROSPEO_API_KEY is set
+PROSPEO_API_URL = "https://api.prospeo.io/domain-search"
+PROSPEO_API_KEY = os.getenv("PROSPEO_API_KEY")
+# Most emails one domain search returns
+PROSPEO_API_LIMIT = int(os.getenv("PROSPEO_API_LIMIT", "50"))
+
+# Set PROSPEO_DEBUG=1 to dump the results page HTML for selector debugging
+PROSPEO_DEBUG = bool(os.getenv("PROSPEO_DEBUG"))
+
+def _dump_debug_html(path, html):
+    """Write a page dump in the background so the scrape doesn't wait on disk"""
+    def _write():
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+            print(f"   💾 Page source saved to {path}")
+        except Exception as e:
+            print(f"   ⚠️ Could not save {path}: {e}")
+    threading.Thread(target=_write, daemon=True).start()
+
 class EmailScraper:
-    def __init__(self):
+    # Compiled once for the class; used on every page source snapshot
+    _email_re = _email_re_engine.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+    
+    def __init__(self, profile_name=BASE_PROFILE, email_filter=None, interactive=True):
+        self.driver = None
+        self.profile_name = profile_name
+        # Pool helpers run on campaign threads with no console: they log in with saved cookies and never prompt
+        self.interactive = interactive
+        self.logged_out = False
+        self._source_cache = (0.0, '')
+        self._browser_lock = threading.RLock()
+        # One HTTP session per campaign thread, since requests sessions aren't thread-safe
+        self._local = threading.local()
+        self._api_disabled = not PROSPEO_API_KEY
+        self.email_filter = email_filter or EmailFilter()
+    
+    def __enter__(self):
+        self.ensure_browser()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+    
+    def _browser_alive(self):
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def ensure_browser(self):
+        """Start the browser unless a live one is already open"""
+        if self._browser_alive():
+            return True
         self.driver = None
-        self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        self.email_filter = EmailFilter()
+        if not self.start_browser():
+            return False
+        if not self.interactive:
+            self.seed_prospeo_cookies()
+        return True
         
     def start_browser(self):
         """Start browser with persistence for Prospeo login"""
@@ -44,14 +148,29 @@ class EmailScraper:
             options.add_argument('--disable-features=VizDisplayCompositor')
             options.add_argument('--no-first-run')
             options.add_argument('--no-default-browser-check')
-            
+
+            # Only the DOM text is scraped: skip images and notification prompts,
+            # and return from driver.get once the DOM is interactive
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            })
+            options.page_load_strategy = 'eager'
+
             # Use persistent profile to save Prospeo login session
-            profile_path = os.path.join(os.getcwd(), "chrome_profile_prospeo")
+            profile_path = os.path.join(os.getcwd(), self.profile_name)
             options.add_argument(f'--user-data-dir={profile_path}')
             print(f"ℹ️ Using Chrome profile: {os.path.abspath(profile_path)}")
             
-            service = ChromeService(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
+            driver_path = chromedriver_path()
+            if driver_path:
+                self.driver = webdriver.Chrome(service=ChromeService(driver_path), options=options)
+            else:
+                # Selenium 4.6+ resolves a matching driver itself
+                self.driver = webdriver.Chrome(options=options)
+            
+            # Explicit WebDriverWaits only; an implicit wait would stall every empty find_elements poll
+            self.driver.implicitly_wait(0)
             
             # Execute script to hide automation detection
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -117,9 +236,8 @@ class EmailScraper:
     def save_login_cookies(self):
         """Save cookies from all login sessions"""
         try:
-            import pickle
-            profile_path = os.path.join(os.getcwd(), "chrome_profile_prospeo")
-            cookies_file = os.path.join(profile_path, "saved_cookies.pkl")
+            profile_path = os.path.join(os.getcwd(), BASE_PROFILE)
+            cookies_file = os.path.join(profile_path, "saved_cookies.json")
             
             all_cookies = {}
             
@@ -138,9 +256,19 @@ class EmailScraper:
             all_cookies['linkedin'] = self.driver.get_cookies()
             print("💾 Saved LinkedIn cookies")
             
-            # Save to file
-            with open(cookies_file, 'wb') as f:
-                pickle.dump(all_cookies, f)
+            # The same cookie often shows up once per subdomain/tab; keep one per (domain, name, path)
+            for service, cookies in all_cookies.items():
+                unique = {}
+                for cookie in cookies:
+                    unique[(cookie.get('domain'), cookie.get('name'), cookie.get('path'))] = cookie
+                all_cookies[service] = list(unique.values())
+            
+            # Save to file atomically so a crash never leaves a half-written cookie file
+            tmp_file = cookies_file + ".tmp"
+            with _cookies_lock:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(all_cookies, f)
+                os.replace(tmp_file, cookies_file)
             
             print(f"✅ All cookies saved to {cookies_file}")
             
@@ -150,16 +278,16 @@ class EmailScraper:
     def load_saved_cookies(self):
         """Load previously saved cookies"""
         try:
-            import pickle
-            profile_path = os.path.join(os.getcwd(), "chrome_profile_prospeo")
-            cookies_file = os.path.join(profile_path, "saved_cookies.pkl")
-            
-            if not os.path.exists(cookies_file):
-                print("ℹ️ No saved cookies found")
-                return False
+            profile_path = os.path.join(os.getcwd(), BASE_PROFILE)
+            cookies_file = os.path.join(profile_path, "saved_cookies.json")
             
-            with open(cookies_file, 'rb') as f:
-                all_cookies = pickle.load(f)
+            with _cookies_lock:
+                if not os.path.exists(cookies_file):
+                    print("ℹ️ No saved cookies found")
+                    return False
+                
+                with open(cookies_file, 'r', encoding='utf-8') as f:
+                    all_cookies = json.load(f)
             
             print("✅ Loaded saved cookies for all services")
             return all_cookies
@@ -168,6 +296,132 @@ class EmailScraper:
             print(f"❌ Failed to load cookies: {e}")
             return False
     
+    def _api_session(self):
+        """This thread's requests session, authenticated with the Prospeo API key"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'X-KEY': PROSPEO_API_KEY, 'Content-Type': 'application/json'})
+            self._local.session = session
+        return session
+    
+    def search_prospeo_emails_api(self, domain):
+        """
+        Query Prospeo's Domain Search API, skipping the browser.
+        Returns None when the caller should fall back to the Selenium flow.
+        """
+        if self._api_disabled:
+            return None
+        
+        try:
+            print(f"⚡ Querying Prospeo API for {domain}...")
+            response = self._api_session().post(
+                PROSPEO_API_URL, json={'company': domain, 'limit': PROSPEO_API_LIMIT}, timeout=30)
+            data = response.json()
+            
+            if data.get('error'):
+                message = data.get('message', '')
+                if message == 'NO_RESULT':
+                    print(f"📧 Prospeo API has no emails for {domain}")
+                    return []
+                if response.status_code == 401 or message in ('INVALID_API_KEY', 'INSUFFICIENT_CREDITS'):
+                    print(f"⚠️ Prospeo API unusable ({message}), using the browser from now on")
+                    self._api_disabled = True
+                    return None
+                print(f"⚠️ Prospeo API error ({message or response.status_code}), falling back to the browser")
+                return None
+            
+            rows = (data.get('response') or {}).get('email_list') or []
+            emails = list(dict.fromkeys(
+                row['email'].lower() for row in rows if isinstance(row, dict) and row.get('email')
+            ))
+            print(f"📧 Prospeo API returned {len(emails)} emails for {domain}")
+            return emails
+        except Exception as e:
+            print(f"⚠️ Prospeo API request failed ({e}), falling back to the browser")
+            return None
+    
+    def seed_prospeo_cookies(self):
+        """Copy the saved Prospeo login cookies into this browser's profile"""
+        all_cookies = self.load_saved_cookies()
+        if not all_cookies or not all_cookies.get('prospeo'):
+            return False
+        
+        try:
+            # Cookies can only be added for the domain that is currently open
+            self.driver.get("https://app.prospeo.io/")
+            added = 0
+            for cookie in all_cookies['prospeo']:
+                try:
+                    self.driver.add_cookie(cookie)
+                    added += 1
+                except Exception:
+                    continue  # Cookie for another subdomain or with a rejected attribute
+            print(f"🍪 Seeded {added} Prospeo cookies into {self.profile_name}")
+            return added > 0
+        except Exception as e:
+            print(f"❌ Failed to seed cookies: {e}")
+            return False
+    
+    # Runs the email regex over the rendered text in the browser and returns unique matches
+    EXTRACT_EMAILS_SCRIPT = r"""
+        const re = /\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b/g;
+        return Array.from(new Set(document.body.innerText.match(re) || []));
+    """
+    
+    # True once the search finished (no loading indicator) and results or a no-results notice rendered;
+    # checked in the browser so each poll returns a boolean instead of the whole page source
+    RESULTS_LOADED_SCRIPT = r"""
+        const text = document.body.innerText;
+        if (text.includes('Searching...') || text.includes('Loading...')) return false;
+        return !!document.querySelector(
+            "div.css-b62m3t-container, .text-heading, [class*='email'], span[class*='text-md']"
+        ) || text.includes('No results found') || text.toLowerCase().includes('emails found');
+    """
+    
+    RESULT_EMAIL_SELECTOR = "span.text-heading.text-md.font-light"
+    
+    def _extract_page_emails(self):
+        """Run EXTRACT_EMAILS_SCRIPT via CDP Runtime.evaluate, falling back to execute_script"""
+        try:
+            response = self.driver.execute_cdp_cmd("Runtime.evaluate", {
+                "expression": f"(() => {{{self.EXTRACT_EMAILS_SCRIPT}}})()",
+                "returnByValue": True,
+            })
+            if 'exceptionDetails' not in response:
+                return response.get('result', {}).get('value') or []
+        except Exception:
+            pass  # Not a Chromium driver, or CDP unavailable
+        return self.driver.execute_script(self.EXTRACT_EMAILS_SCRIPT) or []
+    
+    def _unique_emails(self, html):
+        """Lowercased emails in the HTML, deduplicated in one pass (first-seen order)"""
+        return list(dict.fromkeys(match.group(0).lower() for match in self._email_re.finditer(html)))
+    
+    def _cached_source(self, ttl=0.5, refresh=False):
+        """Return driver.page_source, reusing the last snapshot if it is younger than ttl seconds"""
+        fetched_at, html = self._source_cache
+        now = time.monotonic()
+        if refresh or not html or now - fetched_at > ttl:
+            html = self.driver.page_source
+            self._source_cache = (now, html)
+        return html
+    
+    def _results_stable(self, driver):
+        """True once the result email count is non-zero and stopped changing, or Prospeo reports no emails"""
+        try:
+            first = len(driver.find_elements(By.CSS_SELECTOR, self.RESULT_EMAIL_SELECTOR))
+            time.sleep(0.2)
+            second = len(driver.find_elements(By.CSS_SELECTOR, self.RESULT_EMAIL_SELECTOR))
+            if first > 0 and first == second:
+                return True
+            return driver.execute_script(
+                "return document.body.innerText.includes('No emails found') || "
+                "document.body.innerText.includes('No results found');"
+            )
+        except Exception:
+            return False
+    
     def search_prospeo_emails(self, domain):
         """
         Scrape emails from Prospeo using the proven method from your original bot
@@ -189,6 +443,11 @@ class EmailScraper:
                 )
                 print("✅ Prospeo login session is active. Proceeding to search.")
             except TimeoutException:
+                if not self.interactive:
+                    print(f"⚠️ {self.profile_name} is not logged in to Prospeo, taking it out of rotation")
+                    self.logged_out = True
+                    return []
+                
                 # Login required - pause for manual login
                 print("\n⚠️ PROSPEO LOGIN REQUIRED")
                 print("   The script will now pause. Please complete the login in the browser window.")
@@ -216,49 +475,17 @@ class EmailScraper:
             # Wait for the loading animation to finish and results to appear
             try:
                 WebDriverWait(self.driver, 90).until(
-                    lambda driver: (
-                        # Wait for search to complete (no more loading indicators)
-                        "Searching..." not in driver.page_source and
-                        "Loading..." not in driver.page_source and
-                        (
-                            driver.find_elements(By.CSS_SELECTOR, "div.css-b62m3t-container") or
-                            driver.find_elements(By.CSS_SELECTOR, ".text-heading") or
-                            driver.find_elements(By.CSS_SELECTOR, "[class*='email']") or
-                            driver.find_elements(By.CSS_SELECTOR, "span[class*='text-md']") or
-                            "No results found" in driver.page_source or
-                            "emails found" in driver.page_source.lower()
-                        )
-                    )
+                    lambda driver: driver.execute_script(self.RESULTS_LOADED_SCRIPT)
                 )
                 print("✅ Initial results loaded.")
                 
-                # Wait additional time for all emails to render
+                # Emails render progressively; wait until the result list stops growing
                 print("⏳ Waiting for email data to load...")
-                time.sleep(20)  # Give extra time since this is dynamic content
-                
-                # Use a more robust check that doesn't rely on storing elements
-                def check_for_emails(driver):
-                    try:
-                        # Check if page has emails by looking at page source
-                        page_text = driver.page_source
-                        if "No emails found" in page_text or "No results found" in page_text:
-                            return True
-                        
-                        # Look for actual email addresses in the page
-                        emails_found = len(re.findall(self.email_pattern, page_text))
-                        print(f"   📊 Currently found {emails_found} emails on page")
-                        return emails_found > 2  # Wait for a reasonable number of emails to load
-                    except:
-                        return False
-                
-                WebDriverWait(self.driver, 60).until(check_for_emails)
+                WebDriverWait(self.driver, 60, poll_frequency=0.25).until(self._results_stable)
                 print("✅ Email data loaded.")
                 
             except TimeoutException:
                 print("⚠️ Timeout waiting for results, but continuing...")
-                # Additional wait for dynamic content
-                print("⏳ Waiting additional 15 seconds for dynamic content...")
-                WebDriverWait(self.driver, 15).until(lambda driver: True)  # Just wait
             
         except Exception as e:
             print(f"❌ Search phase failed: {e}")
@@ -275,18 +502,18 @@ class EmailScraper:
         try:
             def final_email_check(driver):
                 try:
-                    page_text = driver.page_source
-                    return page_text.count('@') > 0 or "No emails found" in page_text
+                    return driver.execute_script(
+                        "return !!document.querySelector('span.text-heading') || "
+                        "document.body.innerText.indexOf('@') >= 0 || "
+                        "document.body.innerText.includes('No emails found');"
+                    )
                 except:
                     return False
             
-            WebDriverWait(self.driver, 60).until(final_email_check)
+            WebDriverWait(self.driver, 60, poll_frequency=0.25).until(final_email_check)
             print("✅ Email content detected on page")
         except TimeoutException:
             print("⚠️ No email content detected, but continuing...")
-            # Give it even more time as a final attempt
-            print("⏳ Final wait attempt - 20 more seconds...")
-            WebDriverWait(self.driver, 20).until(lambda driver: True)
         
         # Debug: Print page source snippet to understand structure
         print("🔍 Debugging page structure...")
@@ -297,8 +524,8 @@ class EmailScraper:
         print(f"   - Current URL: {current_url}")
         print(f"   - Page title: {page_title}")
         
-        # Get initial page source
-        page_source = self.driver.page_source
+        # Get initial page source (shared by all the checks below)
+        page_source = self._cached_source()
         
         # Check if we're actually on a results page
         if "domain-search" not in current_url:
@@ -307,25 +534,27 @@ class EmailScraper:
             results_url = f"https://app.prospeo.io/domain-search?domain={domain}"
             print(f"   🔄 Navigating to: {results_url}")
             self.driver.get(results_url)
-            time.sleep(10)  # Wait for page to load
+            try:
+                WebDriverWait(self.driver, 30, poll_frequency=0.25).until(self._results_stable)
+            except TimeoutException:
+                print("   ⚠️ Results did not settle, continuing with what loaded")
             print(f"   - New URL: {self.driver.current_url}")
-            page_source = self.driver.page_source  # Refresh page source
+            page_source = self._cached_source(refresh=True)  # Refresh page source
         
         # Save page source for debugging
-        try:
-            with open("debug_search_page.html", "w", encoding="utf-8") as f:
-                f.write(page_source)
-            print("   💾 Page source saved to debug_search_page.html")
-        except:
-            pass
+        if PROSPEO_DEBUG:
+            _dump_debug_html("debug_search_page.html", page_source)
         
         # Check if we can find emails in the page source first
-        all_emails_on_page = re.findall(self.email_pattern, page_source)
+        all_emails_on_page = self._unique_emails(page_source)
         print(f"   - Total emails found in page source: {len(all_emails_on_page)}")
         
+        domain_emails = []
         if all_emails_on_page:
             print(f"   - All emails found: {all_emails_on_page}")
-            domain_emails = [email for email in all_emails_on_page if domain.lower() in email.lower()]
+            # Match the address's domain exactly, not as a substring of another domain
+            needle = '@' + domain.lower()
+            domain_emails = [email for email in all_emails_on_page if email.endswith(needle)]
             print(f"   - Domain-specific emails in page source: {len(domain_emails)}")
             if domain_emails:
                 for email in domain_emails[:3]:  # Show first 3
@@ -340,79 +569,34 @@ class EmailScraper:
             print(f"   ✅ Page contains domain '{domain}'")
         
         # Look for the specific LinkedIn email pattern from your screenshot
-        linkedin_email_pattern = r'[a-zA-Z0-9._%+-]+@linkedin\.com'
-        linkedin_emails = re.findall(linkedin_email_pattern, page_source)
+        linkedin_emails = [email for email in all_emails_on_page if email.endswith('@linkedin.com')]
         if linkedin_emails:
             print(f"   🎯 Found LinkedIn emails: {linkedin_emails}")
             
         # Save page source for debugging if needed
-        if all_emails_on_page and not domain_emails:
-            print("   💾 Saving page source for debugging...")
-            with open('debug_prospeo_page.html', 'w', encoding='utf-8') as f:
-                f.write(page_source)
-            print("   💾 Page source saved to debug_prospeo_page.html")
-        
-        # Try the specific email selector first based on the actual Prospeo structure
-        email_selectors = [
-            "span.text-heading.text-md.font-light",  # Primary selector for Prospeo emails
-            "span.text-heading",  # Backup without full class
-            ".text-heading",
-            "[class*='text-md']",
-            "span[class*='font-light']",
-            "*[class*='email']",
-            "div[class*='result']",
-            "td",
-            "span",
-            "div"
-        ]
+        if PROSPEO_DEBUG and all_emails_on_page and not domain_emails:
+            _dump_debug_html("debug_prospeo_page.html", page_source)
         
+        # Extract every email from the rendered text in one pass inside the browser
         found_emails = set()
-        email_elements = []
-        best_selector = None
-        
-        print("🔍 Testing email selectors...")
-        for selector in email_selectors:
-            try:
-                # Re-find elements each time to avoid stale references
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                # Count elements that actually contain email addresses
-                email_count = 0
-                actual_emails = []
-                
-                for elem in elements:
-                    try:
-                        elem_text = elem.text.strip()
-                        if '@' in elem_text and '.' in elem_text:
-                            # Validate it's actually an email format
-                            if re.match(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}$', elem_text):
-                                email_count += 1
-                                actual_emails.append(elem_text)
-                    except:
-                        continue  # Skip stale elements
-                
-                if email_count > 0:
-                    print(f"   ✅ Found {email_count} valid emails with selector: {selector}")
-                    for email in actual_emails[:3]:  # Show first 3
-                        print(f"      📧 {email}")
-                    best_selector = selector
-                    found_emails.update(actual_emails)
-                    break
-                elif elements:
-                    print(f"   - Found {len(elements)} elements (no emails) with selector: {selector}")
-            except Exception as e:
-                print(f"   ❌ Error with selector {selector}: {e}")
-                continue
+        print("🔍 Extracting emails from rendered page text...")
+        try:
+            found_emails.update(self._extract_page_emails())
+            if found_emails:
+                print(f"   ✅ Found {len(found_emails)} emails in page text")
+                for email in list(found_emails)[:3]:  # Show first 3
+                    print(f"      📧 {email}")
+        except Exception as e:
+            print(f"   ❌ In-page extraction failed: {e}")
         
-        if not best_selector or not found_emails:
-            print("   - No email elements found with any selector. Trying page source fallback...")
+        if not found_emails:
+            print("   - No emails in page text. Trying page source fallback...")
             # Fallback: search entire page source for emails
-            page_source = self.driver.page_source
-            matches = re.findall(self.email_pattern, page_source)
+            matches = self._unique_emails(self._cached_source())
             print(f"   - Found {len(matches)} emails in page source")
             
-            for email in matches:
-                # Add all emails first, then we'll filter by domain later
-                found_emails.add(email.lower())
+            # Add all emails first, then we'll filter by domain later
+            found_emails.update(matches)
         
         # Return ALL emails found (AI will filter them later)
         if found_emails:
@@ -426,15 +610,24 @@ class EmailScraper:
             return []
     
     def clean_domain(self, domain_input):
-        """Clean and validate domain - same as original"""
-        domain = domain_input.strip().lower()
-        domain = domain.replace('https://', '').replace('http://', '').replace('www.', '')
-        domain = domain.split('/')[0]
+        """Clean and validate domain (memoized, the result only depends on the input)"""
+        return _clean_domain(domain_input)
+    
+    def _scrape_domain(self, clean_domain):
+        """Every email Prospeo lists for a cleaned domain, before AI filtering"""
+        # The HTTP API is much cheaper than driving Chrome; use it when an API key is configured
+        all_emails = self.search_prospeo_emails_api(clean_domain)
         
-        if '.' not in domain:
-            return None
+        if all_emails is None:
+            # Reuse the open browser (and its Prospeo session) across domains
+            with self._browser_lock:
+                if not self.ensure_browser():
+                    return []
+                
+                # Search Prospeo for ALL emails (not just domain-specific)
+                all_emails = self.search_prospeo_emails(clean_domain)
         
-        return domain
+        return all_emails or []
     
     def find_emails(self, domain):
         """Main method to find emails - now uses Prospeo with AI filtering"""
@@ -444,43 +637,78 @@ class EmailScraper:
             return []
         
         try:
-            # Start browser
-            if not self.start_browser():
-                return []
-            
-            # Search Prospeo for ALL emails (not just domain-specific)
-            all_emails = self.search_prospeo_emails(clean_domain)
-            
-            if not all_emails:
-                print("\n🔍 Browser left open for debugging - close manually when done")
-                return []
-            
-            # Filter emails using AI to identify real people
-            print(f"\n🤖 AI filtering {len(all_emails)} emails...")
-            filter_result = self.email_filter.filter_emails(all_emails, clean_domain)
-            
-            real_people_emails = filter_result.get('real_people', [])
-            support_emails = filter_result.get('support_emails', [])
-            analysis = filter_result.get('analysis', '')
-            
-            print(f"✅ AI Analysis: {analysis}")
-            print(f"� Found {len(real_people_emails)} real people emails")
-            print(f"🤖 Filtered out {len(support_emails)} support/generic emails")
-            
-            if real_people_emails:
-                print(f"   Sample real people: {real_people_emails[:3]}{'...' if len(real_people_emails) > 3 else ''}")
-            
-            # Close browser on success
-            self.close_browser()
-            
-            return real_people_emails
-            
+            return self._filter_domain(clean_domain, self._scrape_domain(clean_domain))
         except Exception as e:
+            # The browser stays open; ensure_browser replaces it if it died
             print(f"❌ Email scraping failed: {e}")
-            # Close browser on error
-            self.close_browser()
             return []
     
+    def _filter_domain(self, clean_domain, all_emails):
+        """AI-filter one domain's scraped emails down to real people"""
+        if not all_emails:
+            return []
+        
+        # Filter emails using AI to identify real people
+        print(f"\n🤖 AI filtering {len(all_emails)} emails...")
+        filter_result = self.email_filter.filter_emails(all_emails, clean_domain)
+        
+        real_people_emails = filter_result.emails_only
+        support_emails = filter_result.support_emails
+        analysis = filter_result.analysis
+        
+        print(f"✅ AI Analysis: {analysis}")
+        print(f"� Found {len(real_people_emails)} real people emails")
+        print(f"🤖 Filtered out {len(support_emails)} support/generic emails")
+        
+        if real_people_emails:
+            print(f"   Sample real people: {real_people_emails[:3]}{'...' if len(real_people_emails) > 3 else ''}")
+        
+        return real_people_emails
+    
+    def _scrape_checked(self, domain):
+        """(clean domain, unfiltered emails) for a raw domain, or None if it is invalid or the scrape failed"""
+        clean_domain = self.clean_domain(domain)
+        if not clean_domain:
+            print(f"❌ Invalid domain: {domain}")
+            return None
+        try:
+            return clean_domain, self._scrape_domain(clean_domain)
+        except Exception as e:
+            print(f"❌ Email scraping failed for {domain}: {e}")
+            return None
+    
+    def find_emails_bulk(self, domains, batch=False):
+        """
+        Find emails for several domains in one browser session, returns {domain: emails}
+        
+        Every domain is scraped first, then the AI filtering runs for all of them at once:
+        concurrently by default, or with batch=True as one Gemini Batch API job
+        (half the cost, but the job can take up to a day to finish).
+        """
+        domains = list(domains)
+        return self._filter_bulk(domains, [self._scrape_checked(domain) for domain in domains], batch)
+    
+    def _filter_bulk(self, domains, scraped, batch):
+        """AI-filter scraped domains together; scraped holds _scrape_checked results in domain order"""
+        scraped = {domain: result for domain, result in zip(domains, scraped) if result}
+        pairs = list(scraped.values())
+        
+        if batch:
+            print(f"\n🤖 Submitting {len(pairs)} domains for batch AI filtering...")
+            filtered = self.email_filter.filter_emails_batch(pairs)
+        else:
+            print(f"\n🤖 AI filtering {len(pairs)} domains concurrently...")
+            # Scrape jobs run on plain worker threads, so there is no event loop to share
+            results = asyncio.run(self.email_filter.filter_many(
+                [(emails, clean_domain) for clean_domain, emails in pairs]
+            ))
+            filtered = {clean_domain: result for (clean_domain, _), result in zip(pairs, results)}
+        
+        return {
+            domain: filtered[scraped[domain][0]].emails_only if domain in scraped else []
+            for domain in domains
+        }
+    
     def close_browser(self):
         """Close browser safely"""
         try:
@@ -488,4 +716,76 @@ class EmailScraper:
                 print("🔴 Closing email scraping browser...")
                 self.driver.quit()
         except Exception as e:
-            print(f"❌ Error closing browser: {e}")
\ No newline at end of file
+            print(f"❌ Error closing browser: {e}")
+        finally:
+            self.driver = None
+    
+    def shutdown(self):
+        """Close the shared browser; call once when no more domains will be scraped"""
+        with self._browser_lock:
+            self.close_browser()
+
+
+class BrowserPool:
+    """A fixed set of scrapers, each with its own Chrome profile, searching domains concurrently"""
+    def __init__(self, size=2, email_filter=None):
+        self.size = max(1, size)
+        email_filter = email_filter or EmailFilter()
+        # The first scraper keeps the manual-login profile (and may prompt for a login, as before);
+        # the others start from copies of its saved Prospeo cookies
+        self.scrapers = [
+            EmailScraper(profile_name=BASE_PROFILE, email_filter=email_filter)
+        ] + [
+            EmailScraper(profile_name=f"{BASE_PROFILE}_{i}", email_filter=email_filter, interactive=False)
+            for i in range(1, self.size)
+        ]
+        self._idle = queue.Queue()
+        for scraper in self.scrapers:
+            self._idle.put(scraper)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+    
+    def clean_domain(self, domain_input):
+        return _clean_domain(domain_input)
+    
+    def _scrape_checked(self, domain):
+        """EmailScraper._scrape_checked on the next idle browser (each starts on its first use)"""
+        while True:
+            scraper = self._idle.get()
+            try:
+                result = scraper._scrape_checked(domain)
+            finally:
+                if scraper.logged_out:
+                    # Not put back; the first scraper never drops out, so a browser always frees up
+                    scraper.shutdown()
+                else:
+                    self._idle.put(scraper)
+            if not scraper.logged_out:
+                return result
+    
+    def find_emails(self, domain):
+        """EmailScraper.find_emails, on whichever browser is free"""
+        scraped = self._scrape_checked(domain)
+        if not scraped:
+            return []
+        try:
+            return self.scrapers[0]._filter_domain(*scraped)
+        except Exception as e:
+            print(f"❌ Email scraping failed: {e}")
+            return []
+    
+    def find_emails_bulk(self, domains, batch=False):
+        """Scrape up to `size` domains at a time, then AI-filter them together, returns {domain: emails}"""
+        domains = list(domains)
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            scraped = list(executor.map(self._scrape_checked, domains))
+        return self.scrapers[0]._filter_bulk(domains, scraped, batch)
+    
+    def shutdown(self):
+        for scraper in self.scrapers:
+            scraper.shutdown()
@@ -1,12 +1,55 @@
+import copy
+import html
+import logging
 import smtplib
 import os
+import threading
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 
 load_dotenv()
 
+log = logging.getLogger('outreach.email')
+
+# Consecutive failed sends before a provider is benched
+PROVIDER_FAILURE_LIMIT = 3
+# Seconds a benched provider (or one unreachable at startup) is skipped before it is tried again
+PROVIDER_RETRY_AFTER = 300
+
+
+def _quit_sessions(sessions):
+    """Politely close every SMTP session in the list"""
+    while sessions:
+        server = sessions.pop()
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+
+class RateLimiter:
+    """Hands out send slots at most once per interval, shared across threads"""
+    def __init__(self, per_second=1.0):
+        self.interval = 1.0 / per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        # Reserve the next slot under the lock, then sleep outside it so other
+        # workers can queue up behind us without spinning
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 class EmailService:
     def __init__(self):
         self.email_providers = [
@@ -42,22 +85,67 @@ class EmailService:
             if provider['email'] and provider['password']
         ]
         
+        # Separators in email local parts that become spaces in names
+        self._name_trans = str.maketrans({'-': ' ', '_': ' '})
+        
+        # One logged-in SMTP session per provider per thread, reused across sends
+        self._local = threading.local()
+        self._open_sessions = []
+        self._sessions_lock = threading.Lock()
+        weakref.finalize(self, _quit_sessions, self._open_sessions)
+        
+        # Sessions opened by the startup probe, handed to the first thread that sends
+        self._warm_sessions = {}
+        # Consecutive send failures per provider (circuit breaker), and when benched providers may be retried
+        self._failures = {}
+        self._retry_at = {}
+        self._failures_lock = threading.Lock()
+        
         if not self.email_providers:
-            print("❌ No email providers configured!")
+            log.error("No email providers configured!")
         else:
+            self._probe_providers()
             for provider in self.email_providers:
-                print(f"✅ Email provider ready: {provider['name']}")
+                if not self._tripped(provider):
+                    log.info("Email provider ready: %s", provider['name'])
+    
+    def _probe(self, provider):
+        try:
+            return self._connect(provider)
+        except Exception as e:
+            log.error("%s connection failed: %s", provider['name'], e)
+            return None
+    
+    def _probe_providers(self):
+        """Log in to every provider once, concurrently; unreachable ones are benched for a while, not dropped"""
+        with ThreadPoolExecutor(max_workers=len(self.email_providers)) as executor:
+            servers = list(executor.map(self._probe, self.email_providers))
+        
+        unreachable = []
+        for provider, server in zip(self.email_providers, servers):
+            if server is not None:
+                self._warm_sessions[provider['name']] = server
+                with self._sessions_lock:
+                    self._open_sessions.append(server)
+            else:
+                unreachable.append(provider)
+        
+        if len(unreachable) == len(self.email_providers):
+            # Probably offline at startup; let the first sends retry everything
+            log.warning("No email provider reachable at startup, will retry on first send")
+            return
+        for provider in unreachable:
+            self._bench(provider)
     
     def get_name_from_email(self, email):
         """Extract name from email address"""
-        local = email.split('@')[0]
-        if '.' in local:
-            parts = local.split('.')
-            first = parts[0].replace('-', ' ').replace('_', ' ').title()
-            last = parts[1].replace('-', ' ').replace('_', ' ').title() if len(parts) > 1 else ""
-            return f"{first} {last}".strip()
-        else:
-            return local.replace('-', ' ').replace('_', ' ').title()
+        local = email.partition('@')[0]
+        # Only the first two dot-separated parts make up the name
+        parts = local.split('.', 2)
+        name = parts[0].translate(self._name_trans).title()
+        if len(parts) > 1:
+            name = f"{name} {parts[1].translate(self._name_trans).title()}".strip()
+        return name
     
     def create_email_content(self, recipient_email, company_name, personalized_email_content):
         """Create email subject and use AI-generated body"""
@@ -69,114 +157,270 @@ class EmailService:
         
         return subject, body
     
+    def _connect(self, provider):
+        """Open an authenticated SMTP connection for a provider"""
+        if provider.get('use_ssl', False):
+            # Use SSL connection (port 465)
+            server = smtplib.SMTP_SSL(provider['smtp_server'], provider['port'], timeout=10)
+        else:
+            # Use TLS connection (port 587)
+            server = smtplib.SMTP(provider['smtp_server'], provider['port'], timeout=10)
+            server.starttls()
+        
+        server.login(provider['email'], provider['password'])
+        return server
+    
+    def _get_session(self, provider):
+        """Return this thread's cached SMTP session for a provider, connecting on first use"""
+        sessions = getattr(self._local, 'sessions', None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        
+        server = sessions.get(provider['name'])
+        if server is None:
+            with self._sessions_lock:
+                server = self._warm_sessions.pop(provider['name'], None)
+            if server is not None and self._alive(server):
+                sessions[provider['name']] = server
+                return server
+            log.debug("Connecting to %s:%s", provider['smtp_server'], provider['port'])
+            server = self._connect(provider)
+            sessions[provider['name']] = server
+            with self._sessions_lock:
+                self._open_sessions.append(server)
+        return server
+    
+    def _alive(self, server):
+        """Check a session that sat idle since startup; servers drop those, so a dead one is discarded"""
+        try:
+            if server.noop()[0] == 250:
+                return True
+        except Exception:
+            pass
+        with self._sessions_lock:
+            if server in self._open_sessions:
+                self._open_sessions.remove(server)
+        try:
+            server.close()
+        except Exception:
+            pass
+        return False
+    
+    def _drop_session(self, provider):
+        """Forget (and close) this thread's session for a provider"""
+        sessions = getattr(self._local, 'sessions', None) or {}
+        server = sessions.pop(provider['name'], None)
+        if server is None:
+            return
+        with self._sessions_lock:
+            if server in self._open_sessions:
+                self._open_sessions.remove(server)
+        try:
+            server.quit()
+        except Exception:
+            pass
+    
+    def _close_thread_sessions(self):
+        """Quit the calling thread's sessions, leaving other threads' sends alone"""
+        for name in list(getattr(self._local, 'sessions', None) or {}):
+            self._drop_session({'name': name})
+    
+    def close_sessions(self):
+        """Quit every cached SMTP session"""
+        with self._sessions_lock:
+            self._warm_sessions.clear()
+            _quit_sessions(self._open_sessions)
+        self._local = threading.local()
+    
+    def _send_via(self, provider, msg):
+        """Send over the cached session, reconnecting once if the server dropped it"""
+        try:
+            self._get_session(provider).send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # Idle sessions get closed server-side; retry on a fresh connection
+            self._drop_session(provider)
+            self._get_session(provider).send_message(msg)
+    
+    def _body_parts(self, body):
+        """Encode the plain text and HTML versions of a body (reusable across recipients)"""
+        text_part = MIMEText(body, 'plain')
+        # Escape &, < and > so the body renders as the text it is
+        html_body = html.escape(body, quote=False).replace('\n', '<br>')
+        html_part = MIMEText(html_body, 'html')
+        return text_part, html_part
+    
+    def _build_message(self, provider, to_email, subject, body, parts=None):
+        """Build a plain text + HTML message, reusing pre-encoded body parts if given"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = provider['email']
+        msg['To'] = to_email
+        
+        # Create both plain text and HTML versions
+        text_part, html_part = parts or self._body_parts(body)
+        
+        msg.attach(copy.copy(text_part))
+        msg.attach(copy.copy(html_part))
+        return msg
+    
     def test_connection(self, provider):
         """Test SMTP connection for a provider"""
         try:
-            print(f"🔧 Testing connection to {provider['name']}...")
-            
-            if provider.get('use_ssl', False):
-                # Use SSL connection (port 465)
-                server = smtplib.SMTP_SSL(provider['smtp_server'], provider['port'], timeout=10)
-            else:
-                # Use TLS connection (port 587)
-                server = smtplib.SMTP(provider['smtp_server'], provider['port'], timeout=10)
-                server.starttls()
-            
-            server.login(provider['email'], provider['password'])
+            log.info("Testing connection to %s", provider['name'])
+            server = self._connect(provider)
             server.quit()
-            print(f"✅ {provider['name']} connection successful")
+            log.info("%s connection successful", provider['name'])
             return True
         except Exception as e:
-            print(f"❌ {provider['name']} connection failed: {str(e)}")
+            log.error("%s connection failed: %s", provider['name'], e)
             return False
     
-    def send_email(self, to_email, subject, body):
-        """Send email with fallback providers"""
+    def _tripped(self, provider):
+        """True while a provider is benched; once PROVIDER_RETRY_AFTER has passed it gets another try"""
+        return self._retry_at.get(provider['name'], 0) > time.time()
+    
+    def _bench(self, provider):
+        with self._failures_lock:
+            self._retry_at[provider['name']] = time.time() + PROVIDER_RETRY_AFTER
+            self._failures[provider['name']] = 0
+        log.warning("Skipping %s for %ss", provider['name'], PROVIDER_RETRY_AFTER)
+    
+    def _record_result(self, provider, ok):
+        """Track consecutive failures; a provider that keeps failing is benched for PROVIDER_RETRY_AFTER"""
+        with self._failures_lock:
+            if ok:
+                self._failures[provider['name']] = 0
+                self._retry_at.pop(provider['name'], None)
+                return
+            count = self._failures.get(provider['name'], 0) + 1
+            self._failures[provider['name']] = count
+        if count == PROVIDER_FAILURE_LIMIT:
+            log.warning("%s failed %d times in a row", provider['name'], count)
+            self._bench(provider)
+    
+    def reset_circuits(self):
+        """Clear failure counts (called at the start of each batch); benched providers stay benched until their retry time"""
+        with self._failures_lock:
+            self._failures.clear()
+    
+    def send_email(self, to_email, subject, body, parts=None):
+        """Send email with fallback providers (parts: pre-encoded body from _body_parts)"""
         if not self.email_providers:
-            print("❌ No email providers available")
+            log.error("No email providers available")
             return False
         
-        # Try each provider
+        # Try each provider that hasn't tripped its circuit breaker
         for provider in self.email_providers:
+            if self._tripped(provider):
+                continue
             try:
-                print(f"📧 Trying to send email via {provider['name']}...")
-                print(f"   From: {provider['email']}")
-                print(f"   To: {to_email}")
-                print(f"   Subject: {subject}")
+                # Per-email detail is DEBUG, so at the default INFO level it isn't even formatted
+                log.debug("Sending to %s via %s (from %s): %s", to_email, provider['name'], provider['email'], subject)
                 
                 # Create message
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = provider['email']
-                msg['To'] = to_email
-                
-                # Create both plain text and HTML versions
-                text_part = MIMEText(body, 'plain')
-                html_body = body.replace('\n', '<br>')
-                html_part = MIMEText(html_body, 'html')
-                
-                msg.attach(text_part)
-                msg.attach(html_part)
+                msg = self._build_message(provider, to_email, subject, body, parts)
                 
-                # Send email with detailed error logging and timeout
-                print(f"   Connecting to {provider['smtp_server']}:{provider['port']}...")
+                # Send over the cached session (connects and logs in on first use)
+                self._send_via(provider, msg)
                 
-                if provider.get('use_ssl', False):
-                    # Use SSL connection (port 465)
-                    server = smtplib.SMTP_SSL(provider['smtp_server'], provider['port'], timeout=10)
-                else:
-                    # Use TLS connection (port 587)
-                    server = smtplib.SMTP(provider['smtp_server'], provider['port'], timeout=10)
-                    print(f"   Starting TLS...")
-                    server.starttls()
-                
-                print(f"   Logging in...")
-                server.login(provider['email'], provider['password'])
-                
-                print(f"   Sending message...")
-                server.send_message(msg)
-                server.quit()
-                
-                print(f"✅ Email sent to {to_email} via {provider['name']}")
+                log.debug("Email sent to %s via %s", to_email, provider['name'])
+                self._record_result(provider, True)
                 return True
                 
             except smtplib.SMTPAuthenticationError as e:
-                print(f"❌ {provider['name']} authentication failed: {str(e)}")
-                print(f"   Check if app password is correct for {provider['email']}")
+                log.error("%s authentication failed (check the app password for %s): %s",
+                          provider['name'], provider['email'], e)
+                self._drop_session(provider)
+                self._record_result(provider, False)
             except smtplib.SMTPRecipientsRefused as e:
-                print(f"❌ {provider['name']} recipient refused: {str(e)}")
+                # Session is still usable; only this recipient was rejected
+                log.warning("%s recipient refused: %s", provider['name'], e)
             except smtplib.SMTPServerDisconnected as e:
-                print(f"❌ {provider['name']} server disconnected: {str(e)}")
+                log.warning("%s server disconnected: %s", provider['name'], e)
+                self._drop_session(provider)
+                self._record_result(provider, False)
             except Exception as e:
-                print(f"❌ {provider['name']} failed: {str(e)}")
+                log.warning("%s failed: %s", provider['name'], e)
+                self._drop_session(provider)
+                self._record_result(provider, False)
             
             time.sleep(2)  # Brief delay before trying next provider
         
-        print(f"❌ All email providers failed for {to_email}")
+        log.error("All email providers failed for %s", to_email)
         return False
     
-    def send_bulk_emails(self, email_list, company_name, personalized_email_content):
-        """Send emails to multiple recipients"""
+    def send_bulk_emails(self, email_list, company_name, personalized_email_content,
+                         max_workers=8, per_second=1.0):
+        """Send emails to multiple recipients in parallel, throttled to per_second overall"""
         results = {
             'sent': 0,
             'failed': 0,
             'total': len(email_list)
         }
+        if not email_list:
+            return results
         
-        for email in email_list:
+        limiter = RateLimiter(per_second)
+        self.reset_circuits()
+        # Every recipient gets the same body, so encode it once for the whole batch
+        parts = self._body_parts(personalized_email_content)
+        
+        def send_one(email):
             try:
                 subject, body = self.create_email_content(email, company_name, personalized_email_content)
+                # Throttle globally to avoid provider rate limiting
+                limiter.wait()
+                return self.send_email(email, subject, body, parts)
+            except Exception as e:
+                log.error("Error sending to %s: %s", email, e)
+                return False
+        
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(email_list))) as executor:
+                for sent in executor.map(send_one, email_list):
+                    if sent:
+                        results['sent'] += 1
+                    else:
+                        results['failed'] += 1
+        finally:
+            # Worker threads are gone; don't leave their sessions open
+            self.close_sessions()
+        
+        return results
+    
+    def send_batch(self, messages, min_interval=0.5):
+        """Send (to_email, subject, body) messages, paced at most one per min_interval seconds.
+        
+        Each message goes through send_email, so the batch reuses this thread's cached
+        session (or a warm one from startup) and skips benched providers.
+        Returns a list of booleans aligned with messages.
+        """
+        results = []
+        if not messages:
+            return results
+        
+        if not self.email_providers:
+            log.error("No email providers available")
+            return [False] * len(messages)
+        
+        self.reset_circuits()
+        last_send = 0
+        # Campaigns often repeat a body; encode each distinct one once
+        parts_by_body = {}
+        try:
+            for to_email, subject, body in messages:
+                wait = min_interval - (time.time() - last_send)
+                if wait > 0:
+                    time.sleep(wait)
+                last_send = time.time()
                 
-                if self.send_email(email, subject, body):
-                    results['sent'] += 1
-                else:
-                    results['failed'] += 1
-                
-                # Delay between emails to avoid rate limiting
-                time.sleep(2)
+                parts = parts_by_body.get(body)
+                if parts is None:
+                    parts = parts_by_body[body] = self._body_parts(body)
                 
-            except Exception as e:
-                print(f"❌ Error sending to {email}: {e}")
-                results['failed'] += 1
+                results.append(self.send_email(to_email, subject, body, parts))
+        finally:
+            # Campaign threads are pooled; don't leave this thread's sessions idling until the server drops them
+            self._close_thread_sessions()
         
         return results
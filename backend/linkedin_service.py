@@ -1,7 +1,17 @@
+import json
 import os
+import queue
+import sqlite3
+import statistics
+import threading
 import time
 import re
-from urllib.parse import quote
+from collections import deque
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from urllib.parse import quote, unquote, urlparse
+import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -12,125 +22,429 @@ from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
+from email_filter_core import FIRST_NAMES as _FIRST_NAMES
+
+try:
+    # rapidfuzz's WRatio copes with reordered and partial names; difflib gives a comparable 0-100 score
+    from rapidfuzz import fuzz as _fuzz
+except ImportError:
+    _fuzz = None
 
 load_dotenv()
 
+# Emails (lowercased) and profile URLs already sent a request, shared by every service in the process
+CONTACTED_DB = "connected_profiles.db"
+# Older append-only store, imported into the database once
+LEGACY_CONTACTED_FILE = "connected_profiles.jsonl"
+_contacted_lock = threading.Lock()
+_contacted_db = None
+# Guards the in-memory connected_profiles sets, which pool helpers and concurrent campaigns share
+_seen_lock = threading.Lock()
+
+def _contacted_connection():
+    """Open (and on first use create) the contacted database; call with _contacted_lock held"""
+    global _contacted_db
+    if _contacted_db is None:
+        db = sqlite3.connect(CONTACTED_DB, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS connected (profile_key TEXT PRIMARY KEY, ts INTEGER)")
+        if os.path.exists(LEGACY_CONTACTED_FILE):
+            with open(LEGACY_CONTACTED_FILE, 'r', encoding='utf-8') as f:
+                keys = [json.loads(line) for line in f if line.strip()]
+            now = int(time.time())
+            with db:
+                db.executemany("INSERT OR IGNORE INTO connected VALUES (?, ?)", [(key, now) for key in keys])
+            os.replace(LEGACY_CONTACTED_FILE, LEGACY_CONTACTED_FILE + ".imported")
+        _contacted_db = db
+    return _contacted_db
+
+# LinkedIn's internal JSON API, called with the browser's session cookies
+VOYAGER_API_URL = "https://www.linkedin.com/voyager/api"
+
+# Company page links in search engine result HTML (after percent-decoding redirect links)
+_COMPANY_URL_RE = re.compile(r'https?://(?:[a-z]{2,3}\.)?linkedin\.com/company/([^/?&"\'<>\s]+)')
+DUCKDUCKGO_HTML_URL = "https://html.duckduckgo.com/html/"
+# Page name LinkedIn puts in a company page's og:title (or <title>), e.g. "Ramp | LinkedIn"
+_PAGE_TITLE_RE = re.compile(r'<meta[^>]+property="og:title"[^>]+content="([^"]*)"|<title>([^<]*)</title>', re.I)
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Misses in a row before the connect-overlay shortcut is abandoned for the session
+OVERLAY_MISS_LIMIT = 2
+# Profile sub-route that opens the invite dialog without the rest of the profile; set
+# LINKEDIN_CONNECT_OVERLAY (e.g. 'overlay/connect-form/') if LinkedIn serves it elsewhere
+CONNECT_OVERLAY_PATH = os.getenv('LINKEDIN_CONNECT_OVERLAY', 'overlay/connect/')
+
+# Company name (lowercased) -> LinkedIn people page URL, so Google is only searched once per company
+COMPANY_PAGES_FILE = "linkedin_company_pages.json"
+
+# Name layouts recognised in email local parts, as one alternation:
+# firstname.lastname, firstname.middle.lastname, firstname.m.lastname,
+# firstname_lastname and firstname-lastname (the middle name is dropped)
+_NAME_RE = re.compile(r'^(?P<first>[a-z]+)(?:(?:\.[a-z]+)?\.|[_-])(?P<last>[a-z]+)$')
+
+# Common first names for splitting concatenated local parts ('johnsmith'), bucketed by
+# length so a lookup is one set probe per length instead of a startswith per name
+_FIRST_NAMES_BY_LEN = {}
+for _name in _FIRST_NAMES:
+    _FIRST_NAMES_BY_LEN.setdefault(len(_name), set()).add(_name)
+_FIRST_NAMES_BY_LEN = {length: frozenset(names) for length, names in _FIRST_NAMES_BY_LEN.items()}
+del _name
+# Longest first, so the most specific first name wins
+_FIRST_NAME_LENGTHS = tuple(sorted(_FIRST_NAMES_BY_LEN, reverse=True))
+
+# Common nicknames and the full names they stand for (both directions)
+_ABBREV_TO_FULL = {
+    'mike': frozenset({'michael', 'mikhail'}),
+    'bob': frozenset({'robert'}),
+    'jim': frozenset({'james'}),
+    'bill': frozenset({'william'}),
+    'dave': frozenset({'david'}),
+    'steve': frozenset({'steven'}),
+    'chris': frozenset({'christopher'}),
+    'matt': frozenset({'matthew'}),
+    'alex': frozenset({'alexander'}),
+}
+_FULL_TO_ABBREV = {full: abbrev for abbrev, fulls in _ABBREV_TO_FULL.items() for full in fulls}
+
+# Comma-grouped fallbacks so each lookup is a single find_elements round-trip
+PROFILE_CARD_SELECTOR = (
+    ".entity-result, .reusable-search__result-container, [data-view-name='search-entity-result'], "
+    ".search-result, .search-entity-result, .search-result__wrapper, "
+    "div[class*='entity-result'], div[class*='search-result'], "
+    ".search-results-container .artdeco-card"
+)
+CARD_NAME_SELECTOR = (
+    "a[data-control-name='search_srp_result'] span[aria-hidden='true'], "
+    ".entity-result__title-text a span[aria-hidden='true'], "
+    "a[data-test-app-aware-link] span[aria-hidden='true']"
+)
+CARD_LINK_SELECTOR = (
+    "a[data-control-name='search_srp_result'], .entity-result__title-text a, a[data-test-app-aware-link]"
+)
+# LinkedIn's empty-state panel, so a search with no hits ends the wait instead of timing out
+NO_RESULTS_SELECTOR = ".search-no-results, .artdeco-empty-state"
+# Cards on a company's /people/ page
+PEOPLE_CARD_SELECTOR = "li.org-people-profile-card__profile-card-spacing"
+MORE_BUTTON_SELECTOR = "button[aria-label*='More actions'], button.artdeco-dropdown__trigger"
+# Requests the automation never needs: images, fonts, media and LinkedIn's tracking beacons.
+# Stylesheets stay, since visibility/clickable checks depend on layout.
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.woff", "*.woff2", "*.ttf", "*.mp4",
+    "*/li/track*", "*/realtime/*", "*px.ads.linkedin.com*",
+]
+# LinkedIn labels its action buttons, so aria-label CSS matches replace text-based XPath
+CONNECT_BUTTON_SELECTOR = "button[aria-label*='Connect' i]"
+INVITE_BUTTON_SELECTOR = "button[aria-label*='Invite' i][aria-label*='connect' i]"
+# Connect inside the More dropdown is a div with role="button", not a button
+DROPDOWN_CONNECT_SELECTOR = "div[role='button'][aria-label*='connect' i], .artdeco-dropdown__item[aria-label*='connect' i]"
+SEND_WITHOUT_NOTE_SELECTOR = "button[aria-label*='Send without a note' i]"
+# Connection modal send buttons, most specific first
+SEND_BUTTON_SELECTORS = [
+    SEND_WITHOUT_NOTE_SELECTOR,
+    "button[aria-label*='Send now' i]",
+    "button[aria-label*='Send' i]",
+]
+# Confirmation wording in LinkedIn's toast after an invitation goes out
+_SUCCESS_RE = re.compile(r"invitation sent|connection request sent|pending", re.I)
+TOAST_SELECTOR = ".artdeco-toast-item__message, [role='alert']"
+TOAST_TEXT_SCRIPT = "const t = document.querySelector(arguments[0]); return t ? t.innerText : '';"
+# Every connection modal variant as one CSS union, matched in a single query
+MODAL_SELECTOR = ".artdeco-modal, [role='dialog'], .send-invite-modal, .connect-modal"
+
+# Summarises the first N result cards in one round-trip: [total cards, [{name, url, connect, message, more}]].
+# connect/more come back as element handles so the chosen card's button can be clicked directly.
+CARD_SUMMARY_SCRIPT = r"""
+const [cardSel, nameSel, linkSel, moreSel, limit] = arguments;
+const cards = document.querySelectorAll(cardSel);
+const findButton = (card, label) => Array.from(card.querySelectorAll('button')).find(
+    b => b.textContent.includes(label) || (b.getAttribute('aria-label') || '').includes(label)) || null;
+return [cards.length, Array.from(cards).slice(0, limit).map(card => {
+    const name = card.querySelector(nameSel);
+    const link = card.querySelector(linkSel);
+    return {
+        name: name ? name.innerText.trim() : '',
+        url: link ? link.href : '',
+        connect: findButton(card, 'Connect'),
+        message: !!findButton(card, 'Message'),
+        more: card.querySelector(moreSel),
+    };
+})];
+"""
+
+# Resolves as soon as a selector matches, via a MutationObserver in the page rather than
+# repeated driver polls: true when found, false after timeoutMs
+WAIT_FOR_SELECTOR_SCRIPT = r"""
+const [sel, timeoutMs, done] = arguments;
+if (document.querySelector(sel)) return done(true);
+const timer = setTimeout(() => { observer.disconnect(); done(false); }, timeoutMs);
+const observer = new MutationObserver(() => {
+    if (document.querySelector(sel)) { clearTimeout(timer); observer.disconnect(); done(true); }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true});
+"""
+
+# Clicks the first match for a selector in the same call that finds it
+CLICK_FIRST_SCRIPT = (
+    "const el = document.querySelector(arguments[0]); "
+    "if (el) { el.click(); return true; } return false;"
+)
+
+# First element matching any of a priority-ordered list of selectors ('//' prefix = XPath),
+# in one round-trip: [index of the selector that matched, element] or null
+FIRST_MATCH_SCRIPT = r"""
+const sels = arguments[0];
+for (let i = 0; i < sels.length; i++) {
+    const el = sels[i].startsWith('//')
+        ? document.evaluate(sels[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(sels[i]);
+    if (el) return [i, el];
+}
+return null;
+"""
+
+LOGGED_IN_SCRIPT = (
+    "return !!(document.querySelector('[class*=\"global-nav__me\"]') || "
+    "document.querySelector('[data-control-name=\"identity_welcome_message\"]') || "
+    "document.body.innerText.toLowerCase().includes('sign out'));"
+)
+
+# Minimum 0-100 similarity for a search result to count as the person we're looking for
+NAME_MATCH_THRESHOLD = 80
+
+def _name_similarity(a, b):
+    """0-100 similarity between two names"""
+    if _fuzz is not None:
+        return _fuzz.WRatio(a, b)
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio() * 100
+
+@lru_cache(maxsize=4096)
+def _extract_name(email):
+    """Likely person name for an email (pure, so results are memoized)"""
+    # Get the part before @
+    local_part = email.split('@')[0]
+    local_lower = local_part.lower()
+    
+    match = _NAME_RE.match(local_lower)
+    if match:
+        first, last = match.group('first', 'last')
+        # Better validation for names
+        if len(first) >= 2 and len(last) >= 2:
+            return f"{first.title()} {last.title()}"
+    
+    # For names like 'jucano', 'magolden', etc. - treat as single names
+    if len(local_part) >= 4 and local_part.isalpha():
+        # Try to intelligently split concatenated names
+        # Look for pattern: common first names + rest
+        for length in _FIRST_NAME_LENGTHS:
+            if len(local_part) > length + 2 and local_lower[:length] in _FIRST_NAMES_BY_LEN[length]:
+                return f"{local_lower[:length].title()} {local_part[length:].title()}"
+        
+        # For emails like 'jucano@tesla.com' - just return as single name
+        # This is better than splitting into 'J Ucano'
+        return local_part.title()
+    
+    return None
+
+@lru_cache(maxsize=4096)
+def _names_match(extracted_lower, linkedin_lower):
+    """names_match on already lowercased and stripped names (pure, so results are memoized)"""
+    # Direct match
+    if extracted_lower == linkedin_lower:
+        return True
+    
+    # Split names into parts
+    extracted_parts = extracted_lower.split()
+    linkedin_parts = linkedin_lower.split()
+    
+    # For single word extracted names, be more conservative
+    if len(extracted_parts) == 1:
+        extracted_word = extracted_parts[0]
+        
+        # Need at least 4 characters for matching
+        if len(extracted_word) < 4:
+            return False
+        
+        ext_len = len(extracted_word)
+        full_names = _ABBREV_TO_FULL.get(extracted_word, ())
+        abbrev = _FULL_TO_ABBREV.get(extracted_word)
+        
+        # Check for strong substring matches
+        for linkedin_part in linkedin_parts:
+            part_len = len(linkedin_part)
+            # Must be a significant portion of either name (at least 60% of the other)
+            if extracted_word in linkedin_part and ext_len >= part_len * 0.6:
+                return True
+            if linkedin_part in extracted_word and part_len >= ext_len * 0.6:
+                return True
+            
+            # Common name abbreviations, in both directions
+            if any(full_name in linkedin_part for full_name in full_names):
+                return True
+            if abbrev and abbrev in linkedin_part:
+                return True
+                    
+        return False
+    
+    # For multi-part names, use the original logic
+    if len(extracted_parts) >= 2 and len(linkedin_parts) >= 2:
+        # Check if first and last names match (allowing for middle names, etc.)
+        first_match = any(extracted_parts[0] in part or part in extracted_parts[0] for part in linkedin_parts)
+        last_match = any(extracted_parts[-1] in part or part in extracted_parts[-1] for part in linkedin_parts)
+        return first_match and last_match
+    
+    return False
+
 class LinkedInService:
-    def __init__(self):
+    # chromedriver path, resolved once per process ('' = let Selenium Manager find one)
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+    
+    def __init__(self, profile_name="chrome_profile_linkedin", workers=None, headless=False):
         self.driver = None
+        # Headless runs need a profile that is already logged in
+        self.headless = headless
+        # Set LINKEDIN_DEBUG=1 to save the page when a search finds no results
+        self.debug = bool(os.getenv('LINKEDIN_DEBUG'))
+        self.wait = None
+        # Recent successful wait durations, used to size default timeouts
+        self._wait_times = deque(maxlen=32)
+        self.profile_name = profile_name
+        # Browsers searching at once. Extra workers use their own Chrome profiles, which must
+        # already be logged in (run once with LINKEDIN_WORKERS set and log each one in)
+        self.workers = workers or int(os.getenv('LINKEDIN_WORKERS', '1'))
+        self._helpers = []
+        self._driver_pool = None
+        self._pool_lock = threading.Lock()
         self.linkedin_email = os.getenv('LINKEDIN_EMAIL')
         self.linkedin_password = os.getenv('LINKEDIN_PASSWORD')
-        self.connected_profiles = set()
+        self.connected_profiles = self._load_contacted()
+        self._company_pages = None
+        # Pages found by guessing the slug from the name; another company can own that slug, so they're kept for this run only
+        self._guessed_pages = {}
+        # One keep-alive HTTP session for every request made outside the browser
+        self._http = requests.Session()
+        self._http.headers['user-agent'] = HTTP_USER_AGENT
+        # Voyager API headers, set once the browser's LinkedIn cookies are copied into _http
+        self._voyager = None
+        # Consecutive profiles where the connect overlay didn't open; the route is dropped after a few
+        self._overlay_misses = 0
+        self._overlay_lock = threading.Lock()
         
         if not self.linkedin_email or not self.linkedin_password:
             print("❌ LinkedIn credentials not configured")
     
-    def extract_name_from_email(self, email):
-        """Extract likely person name from email address with improved logic"""
+    @staticmethod
+    def _load_contacted():
+        """Everyone contacted on earlier runs, so they are skipped without opening a page"""
         try:
-            # Get the part before @
-            local_part = email.split('@')[0]
-            
-            # Enhanced patterns for extracting names
-            patterns = [
-                r'^([a-z]+)\.([a-z]+)$',      # firstname.lastname
-                r'^([a-z]+)\.([a-z]+)\.([a-z]+)$', # firstname.middle.lastname  
-                r'^([a-z]+)\.([a-z])\.([a-z]+)$',  # firstname.m.lastname
-                r'^([a-z]+)_([a-z]+)$',       # firstname_lastname
-                r'^([a-z]+)-([a-z]+)$',       # firstname-lastname
-            ]
-            
-            for pattern in patterns:
-                match = re.match(pattern, local_part.lower())
-                if match:
-                    groups = match.groups()
-                    if len(groups) == 2:
-                        first, last = groups
-                        # Better validation for names
-                        if len(first) >= 2 and len(last) >= 2:
-                            return f"{first.title()} {last.title()}"
-                    elif len(groups) == 3:
-                        first, middle, last = groups
-                        if len(first) >= 2 and len(last) >= 2:
-                            return f"{first.title()} {last.title()}"
-            
-            # For names like 'jucano', 'magolden', etc. - treat as single names
-            if len(local_part) >= 4 and local_part.isalpha():
-                # Check if it's a likely single concatenated name
-                common_prefixes = ['mc', 'mac', 'van', 'de', 'la', 'le']
-                
-                # Try to intelligently split concatenated names
-                # Look for pattern: common first names + rest
-                first_names = ['james', 'john', 'robert', 'michael', 'william', 'david', 'richard', 'thomas', 'charles', 'christopher',
-                              'daniel', 'matthew', 'anthony', 'mark', 'donald', 'steven', 'paul', 'andrew', 'joshua', 'kenneth',
-                              'mary', 'patricia', 'jennifer', 'linda', 'elizabeth', 'barbara', 'susan', 'jessica', 'sarah', 'karen',
-                              'nancy', 'lisa', 'betty', 'helen', 'sandra', 'donna', 'carol', 'ruth', 'sharon', 'michelle']
-                
-                # Check if starts with a common first name
-                for fname in first_names:
-                    if local_part.lower().startswith(fname) and len(local_part) > len(fname) + 2:
-                        first = fname
-                        last = local_part[len(fname):]
-                        return f"{first.title()} {last.title()}"
-                
-                # For emails like 'jucano@tesla.com' - just return as single name
-                # This is better than splitting into 'J Ucano'
-                return local_part.title()
-            
-            return None
-            
+            with _contacted_lock:
+                rows = _contacted_connection().execute("SELECT profile_key FROM connected").fetchall()
+            return {key for (key,) in rows}
         except Exception as e:
-            print(f"❌ Error extracting name from {email}: {e}")
-            return None
+            print(f"⚠️ Could not load contacted profiles: {e}")
+            return set()
     
-    def start_browser(self):
-        """Start Chrome browser with persistent profile for LinkedIn"""
+    def _remember_contact(self, key):
+        """Record a sent request in memory and on disk; False if it was already recorded"""
+        with _seen_lock:
+            self.connected_profiles.add(key)
         try:
-            print("🌐 Starting LinkedIn browser...")
-            
-            options = Options()
-            
-            # Remove automation detection flags
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-            
-            # Add realistic user agent
-            options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            # Use dedicated LinkedIn profile (separate from Prospeo)
-            profile_path = os.path.join(os.getcwd(), "chrome_profile_linkedin")
-            options.add_argument(f'--user-data-dir={profile_path}')
-            
-            # Standard options
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--start-maximized')
-            options.add_argument('--disable-logging')
-            options.add_argument('--log-level=3')
-            options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            
-            service = ChromeService(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            
-            # Execute script to hide automation detection
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            print("✅ LinkedIn browser started successfully")
-            return True
-            
+            with _contacted_lock:
+                db = _contacted_connection()
+                with db:
+                    cursor = db.execute("INSERT OR IGNORE INTO connected VALUES (?, ?)", (key, int(time.time())))
+                return cursor.rowcount == 1
         except Exception as e:
-            print(f"❌ LinkedIn browser startup failed: {e}")
+            print(f"⚠️ Could not save contacted profile: {e}")
+            return True
+    
+    def _claim_profile(self, key):
+        """Mark a profile as handled; False if another search (or an earlier run) already had it"""
+        with _seen_lock:
+            if key in self.connected_profiles:
+                return False
+            self.connected_profiles.add(key)
+            return True
+    
+    def extract_name_from_email(self, email):
+        """Extract likely person name from email address with improved logic"""
+        if not isinstance(email, str) or '@' not in email:
+            return None
+        return _extract_name(email)
+    
+    @classmethod
+    def _chromedriver_path(cls):
+        """Resolved once per process; CHROMEDRIVER_PATH pins it and skips the CDN version check"""
+        with cls._driver_path_lock:
+            if cls._driver_path is None:
+                cls._driver_path = os.getenv("CHROMEDRIVER_PATH", "")
+                if not cls._driver_path:
+                    try:
+                        cls._driver_path = ChromeDriverManager().install()
+                    except Exception as e:
+                        print(f"⚠️ webdriver_manager failed ({e}), falling back to Selenium Manager")
+            return cls._driver_path
+    
+    def ensure_browser(self):
+        """Reuse the open browser (and its LinkedIn session); start one only if none is alive"""
+        if self.driver:
+            try:
+                self.driver.current_url
+                return True
+            except Exception:
+                self.driver = None
+        return self.start_browser()
+    
+    def _default_timeout(self):
+        """Twice the median recent wait, between 2 and 10 seconds (10 until there is history)"""
+        if not self._wait_times:
+            return 10
+        return min(10, max(2, 2 * statistics.median(self._wait_times)))
+    
+    def _wait_until(self, condition, timeout=None):
+        """Wait for an expected condition; returns False instead of raising on timeout"""
+        if timeout is None:
+            timeout = self._default_timeout()
+        started = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(condition)
+        except TimeoutException:
+            return False
+        self._wait_times.append(time.monotonic() - started)
+        return result
+    
+    def _wait_for_selector(self, selector, timeout=10):
+        """Block until selector matches on the current page (one async script call); False on timeout"""
+        try:
+            return bool(self.driver.execute_async_script(WAIT_FOR_SELECTOR_SCRIPT, selector, int(timeout * 1000)))
+        except Exception:
             return False
     
-    def login_to_linkedin(self):
-        """Log in to LinkedIn (or check if already logged in)"""
+    def _click_first(self, selector):
+        """Click the first element matching selector, if any, in one round-trip"""
+        return self.driver.execute_script(CLICK_FIRST_SCRIPT, selector)
+    
+    def _first_match(self, selectors):
+        """(selector, element) for the first selector in the list that matches, or None"""
+        match = self.driver.execute_script(FIRST_MATCH_SCRIPT, selectors)
+        return (selectors[match[0]], match[1]) if match else None
+    
+    def _logged_in_on_page(self):
+        """Profile menu, welcome banner or a sign-out link on the page, checked in the browser"""
+        return self.driver.execute_script(LOGGED_IN_SCRIPT)
+    
+    def login_to_linkedin(self, interactive=True):
+        """Log in to LinkedIn (or check if already logged in).
+        With interactive=False a missing session returns False instead of waiting for a manual login."""
         try:
             print("🔐 Checking LinkedIn login status...")
             
-            # Go to LinkedIn
+            # Go to LinkedIn and wait until it either lands on the feed or shows the login form
             self.driver.get("https://www.linkedin.com")
-            time.sleep(5)
+            self._wait_until(EC.any_of(
+                EC.url_contains("feed"),
+                EC.presence_of_element_located((By.ID, "username")),
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".global-nav__me"))
+            ))
             
             # Check if already logged in by looking for common logged-in elements
             logged_in_indicators = [
@@ -141,7 +455,6 @@ class LinkedInService:
             ]
             
             current_url = self.driver.current_url.lower()
-            page_source = self.driver.page_source.lower()
             
             # Check URL indicators
             for indicator in logged_in_indicators:
@@ -150,9 +463,7 @@ class LinkedInService:
                     return True
             
             # Check for logout link or profile menu as indicators of being logged in
-            if ("sign out" in page_source or 
-                "global-nav__me" in page_source or 
-                'data-control-name="identity_welcome_message"' in page_source):
+            if self._logged_in_on_page():
                 print("✅ Already logged in to LinkedIn (element check)")
                 return True
             
@@ -160,6 +471,8 @@ class LinkedInService:
             login_elements = self.driver.find_elements(By.ID, "username")
             if login_elements:
                 print("🔑 Login required - LinkedIn session expired")
+                if not interactive:
+                    return False
                 print("⚠️ Please log in manually in the browser window")
                 print("   1. Use the same Google account you used before")
                 print("   2. Complete any 2FA if required")
@@ -167,11 +480,13 @@ class LinkedInService:
                 input("   >>> After logging in successfully, press Enter to continue...")
                 
                 # Verify login was successful
-                time.sleep(3)
                 self.driver.get("https://www.linkedin.com/feed")
-                time.sleep(3)
+                self._wait_until(EC.any_of(
+                    EC.url_contains("feed"),
+                    EC.presence_of_element_located((By.ID, "username"))
+                ))
                 
-                if "feed" in self.driver.current_url or "sign out" in self.driver.page_source.lower():
+                if "feed" in self.driver.current_url or self._logged_in_on_page():
                     print("✅ Login verified successfully")
                     return True
                 else:
@@ -183,6 +498,8 @@ class LinkedInService:
             
         except Exception as e:
             print(f"❌ LinkedIn login check failed: {e}")
+            if not interactive:
+                return False
             print(">>> Please ensure you're logged in, then press Enter to continue...")
             input()
             return True
@@ -193,55 +510,30 @@ class LinkedInService:
             print(f"\n🔗 Starting LinkedIn automation for {company_name}")
             print(f"📧 Processing {len(email_list)} emails...")
             
-            if not self.start_browser():
+            batch = self._prepare_emails(email_list, max_connections)
+            if not batch:
+                print("ℹ️ No new people to contact, skipping the browser")
+                return {'connections_sent': 0, 'emails_processed': 0, 'results': {}}
+            
+            if not self.ensure_browser():
                 return 0
             
             if not self.login_to_linkedin():
                 return 0
             
-            connections_sent = 0
-            
-            for i, email in enumerate(email_list[:max_connections], 1):
-                print(f"\n👤 ({i}/{min(len(email_list), max_connections)}) Processing: {email}")
-                
-                # Extract name from email
-                person_name = self.extract_name_from_email(email)
-                if not person_name:
-                    print(f"   ❌ Could not extract name from {email}")
-                    continue
-                
-                print(f"   📝 Extracted name: {person_name}")
-                
-                # Check if browser is still active
-                try:
-                    current_url = self.driver.current_url
-                    print(f"   🌐 Browser active on: {current_url[:50]}...")
-                except Exception as e:
-                    print(f"   ❌ Browser session lost: {e}")
-                    print(f"   🔄 Restarting browser...")
-                    if not self.start_browser() or not self.login_to_linkedin():
-                        print(f"   ❌ Could not restart browser session")
-                        break
-                
-                # Search for the person on LinkedIn
-                if self.search_person_and_connect(person_name, company_name, email):
-                    connections_sent += 1
-                    print(f"   ✅ Connection request sent to {person_name}")
-                    # Wait between requests to avoid being flagged
-                    time.sleep(8)
-                else:
-                    print(f"   ❌ Failed to connect with {person_name}")
-                
-                # Small delay between searches
-                time.sleep(3)
+            pool = self._worker_pool()
+            process = partial(self._process_email, company_name=company_name, total=len(batch))
+            with ThreadPoolExecutor(max_workers=pool.qsize()) as executor:
+                results = list(executor.map(process, batch, range(1, len(batch) + 1)))
+            connections_sent = sum(results)
             
             print(f"\n📊 LinkedIn automation complete!")
             print(f"   ✅ Connection requests sent: {connections_sent}")
-            print(f"   📧 Emails processed: {len(email_list[:max_connections])}")
+            print(f"   📧 Emails processed: {len(batch)}")
             
             return {
                 'connections_sent': connections_sent,
-                'emails_processed': len(email_list[:max_connections]),
+                'emails_processed': len(batch),
                 'results': {}  # Could add individual results here if needed
             }
             
@@ -249,13 +541,87 @@ class LinkedInService:
             print(f"❌ LinkedIn automation failed: {e}")
             return 0
         finally:
-            if self.driver:
+            if self.driver and not self.headless:
+                # The browser stays open for the next batch; close() shuts it down
                 print("🔄 Keeping browser open for manual inspection...")
-                input("Press Enter to close browser...")
-                try:
-                    self.driver.quit()
-                except:
-                    pass
+                input("Press Enter to continue...")
+    
+    def _prepare_emails(self, email_list, max_connections):
+        """(email, name) pairs worth searching for, up to max_connections, worked out before any browsing"""
+        prepared = []
+        for email in email_list:
+            if len(prepared) >= max_connections:
+                break
+            if isinstance(email, str) and email.lower() in self.connected_profiles:
+                print(f"   ⏭️ Skipping {email} (already contacted)")
+                continue
+            person_name = self.extract_name_from_email(email)
+            if not person_name:
+                print(f"   ❌ Could not extract name from {email}")
+                continue
+            prepared.append((email, person_name))
+        return prepared
+    
+    def _worker_pool(self):
+        """Idle services (this one plus helpers with their own Chrome profiles), each logged in"""
+        # Built once, even when two campaigns start together, so no profile is opened twice
+        with self._pool_lock:
+            if self._driver_pool is None:
+                pool = queue.Queue()
+                pool.put(self)
+                for i in range(1, self.workers):
+                    helper = LinkedInService(profile_name=f"{self.profile_name}_{i}", workers=1, headless=self.headless)
+                    # Share the record of contacted profiles across workers
+                    helper.connected_profiles = self.connected_profiles
+                    # Campaign threads have no console to log in from, so a helper without a session is dropped
+                    if helper.start_browser() and helper.login_to_linkedin(interactive=False):
+                        self._helpers.append(helper)
+                        pool.put(helper)
+                    else:
+                        print(f"⚠️ Skipping worker profile {helper.profile_name} (not logged in)")
+                        helper.close_browser()
+                self._driver_pool = pool
+            return self._driver_pool
+    
+    def _process_email(self, prepared, index, company_name, total):
+        """Run one (email, name) pair on whichever worker browser is free"""
+        email, person_name = prepared
+        service = self._driver_pool.get()
+        try:
+            return service._search_email(email, person_name, company_name, index, total)
+        finally:
+            self._driver_pool.put(service)
+    
+    def _search_email(self, email, person_name, company_name, index, total):
+        """Find the person behind one email and connect; True if a request was sent"""
+        print(f"\n👤 ({index}/{total}) Processing: {email}")
+        print(f"   📝 Extracted name: {person_name}")
+        
+        # Check if browser is still active
+        try:
+            current_url = self.driver.current_url
+            print(f"   🌐 Browser active on: {current_url[:50]}...")
+        except Exception as e:
+            print(f"   ❌ Browser session lost: {e}")
+            print(f"   🔄 Restarting browser...")
+            # Worker threads have no console, so a lost login is reported instead of prompted for
+            if not self.start_browser() or not self.login_to_linkedin(interactive=False):
+                print(f"   ❌ Could not restart a logged-in browser session")
+                return False
+        
+        # Search for the person on LinkedIn
+        sent = self.search_person_and_connect(person_name, company_name, email)
+        if sent:
+            self._remember_contact(email.lower())
+            print(f"   ✅ Connection request sent to {person_name}")
+            # Wait between requests to avoid being flagged (per worker)
+            time.sleep(8)
+        else:
+            print(f"   ❌ Failed to connect with {person_name}")
+        
+        # Small delay between searches
+        time.sleep(3)
+        return sent
     
     def search_person_and_connect(self, person_name, company_name, email):
         """Search for a specific person and send connection request"""
@@ -267,64 +633,38 @@ class LinkedInService:
             # Go to LinkedIn search
             search_url = f"https://www.linkedin.com/search/results/people/?keywords={quote(search_query)}"
             self.driver.get(search_url)
-            time.sleep(3)
             
             # Wait for search results to load
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".search-results-container, .search-results, .entity-result"))
-                )
+            if self._wait_for_selector(f".search-results-container, .search-results, .entity-result, {NO_RESULTS_SELECTOR}"):
                 print("   ✅ Search results loaded")
-            except TimeoutException:
+            else:
                 print("   ⚠️ Search results not loading, continuing...")
             
-            # Look for profile cards with updated selectors for current LinkedIn
-            profile_cards = self.driver.find_elements(By.CSS_SELECTOR, 
-                ".entity-result, .reusable-search__result-container, [data-view-name='search-entity-result']")
+            # Read the first cards' names, links and buttons in a single script call
+            card_count, profile_cards = self.driver.execute_script(
+                CARD_SUMMARY_SCRIPT, PROFILE_CARD_SELECTOR, CARD_NAME_SELECTOR, CARD_LINK_SELECTOR, MORE_BUTTON_SELECTOR, 3)
             
-            if not profile_cards:
-                # Try alternative selectors
-                profile_cards = self.driver.find_elements(By.CSS_SELECTOR, 
-                    ".search-result, .search-entity-result, .search-result__wrapper")
-                
-            if not profile_cards:
-                # Try even more generic selector
-                profile_cards = self.driver.find_elements(By.XPATH, 
-                    "//div[contains(@class, 'entity-result') or contains(@class, 'search-result')]")
-            
-            # NEW: Try the actual structure we found
-            if not profile_cards:
-                profile_cards = self.driver.find_elements(By.CSS_SELECTOR, 
-                    ".search-results-container .artdeco-card")
-            
-            if not profile_cards:
+            if not card_count:
                 print(f"   ❌ No search results found for {person_name}")
                 print(f"   🔍 Current URL: {self.driver.current_url}")
                 print(f"   📄 Page title: {self.driver.title}")
-                # Save page source for debugging
-                with open("debug_linkedin_search.html", "w", encoding="utf-8") as f:
-                    f.write(self.driver.page_source)
-                print(f"   💾 Page source saved to debug_linkedin_search.html")
+                if self.debug:
+                    # Save page source for debugging
+                    with open("debug_linkedin_search.html", "w", encoding="utf-8") as f:
+                        f.write(self.driver.page_source)
+                    print(f"   💾 Page source saved to debug_linkedin_search.html")
                 return False
             
-            print(f"   📋 Found {len(profile_cards)} potential matches")
+            print(f"   📋 Found {card_count} potential matches")
             
             # Try to find the right person and connect
-            for i, card in enumerate(profile_cards[:3]):  # Check first 3 results
+            for i, card in enumerate(profile_cards):  # First 3 results
                 try:
-                    # Look for the person's name in the card
-                    name_elements = card.find_elements(By.CSS_SELECTOR, 
-                        "a[data-control-name='search_srp_result'] span[aria-hidden='true'], .entity-result__title-text a span[aria-hidden='true']")
-                    
-                    # NEW: Try the actual selector we found in HTML
-                    if not name_elements:
-                        name_elements = card.find_elements(By.CSS_SELECTOR, 
-                            "a[data-test-app-aware-link] span[aria-hidden='true']")
-                    
-                    if not name_elements:
+                    # Cards without a name element are skipped
+                    found_name = card['name']
+                    if not found_name:
                         continue
-                        
-                    found_name = name_elements[0].text
+                    
                     print(f"   👤 Checking profile {i+1}: {found_name}")
                     
                     # Check if this looks like our person
@@ -332,62 +672,28 @@ class LinkedInService:
                         print(f"   ✅ Found matching profile: {found_name}")
                         
                         # Strategy 1: Look for direct Connect button
-                        connect_buttons = card.find_elements(By.XPATH, 
-                            ".//button[contains(text(), 'Connect') or contains(@aria-label, 'Connect')]")
-                        
-                        if connect_buttons:
+                        if card['connect']:
                             print(f"   🔗 Found Connect button - sending direct connection request...")
-                            return self.send_connection_request(connect_buttons[0], found_name)
+                            return self.send_connection_request(card['connect'], found_name)
                         
                         # Strategy 2: Only Message button - need to visit profile
-                        message_buttons = card.find_elements(By.XPATH, 
-                            ".//button[contains(text(), 'Message') or contains(@aria-label, 'Message')]")
-                        
-                        # NEW: Also try the exact selector we found in HTML analysis
-                        if not message_buttons:
-                            message_buttons = card.find_elements(By.CSS_SELECTOR, 
-                                "button.artdeco-button--secondary[aria-label*='Message']")
-                        
-                        if message_buttons:
+                        if card['message']:
                             print(f"   � Found Message button - visiting profile for Connect option...")
                             
-                            # Get profile link
-                            profile_links = card.find_elements(By.CSS_SELECTOR, 
-                                "a[data-control-name='search_srp_result'], .entity-result__title-text a")
-                            
-                            # NEW: Try the actual selector we found in HTML
-                            if not profile_links:
-                                profile_links = card.find_elements(By.CSS_SELECTOR, 
-                                    "a[data-test-app-aware-link]")
-                                profile_links = card.find_elements(By.CSS_SELECTOR, 
-                                    "a[data-test-app-aware-link]")
-                            
-                            if profile_links:
-                                profile_url = profile_links[0].get_attribute('href')
-                                return self.visit_profile_and_connect(profile_url, found_name)
+                            if card['url']:
+                                return self.visit_profile_and_connect(card['url'], found_name)
                         
                         # Strategy 3: Look for "More" button to expand options
-                        more_buttons = card.find_elements(By.XPATH, 
-                            ".//button[contains(@aria-label, 'More actions') or contains(text(), 'More')]")
-                        
-                        if more_buttons:
+                        if card['more']:
                             print(f"   ⚙️ Found More button - expanding options...")
-                            self.driver.execute_script("arguments[0].click();", more_buttons[0])
-                            time.sleep(2)
-                            
-                            # Look for Connect in the dropdown - it's a div with role="button", not a button!
-                            dropdown_connect = self.driver.find_elements(By.CSS_SELECTOR, 
-                                "div[role='button'][aria-label*='connect' i], .artdeco-dropdown__item[aria-label*='connect' i]")
-                            
-                            if not dropdown_connect:
-                                # Fallback to text-based search
-                                dropdown_connect = self.driver.find_elements(By.XPATH, 
-                                    "//div[@role='button'][contains(text(), 'Connect')] | //div[contains(@class, 'artdeco-dropdown__item')][contains(text(), 'Connect')]")
+                            self.driver.execute_script("arguments[0].click();", card['more'])
+                            self._wait_until(EC.presence_of_element_located(
+                                (By.CSS_SELECTOR, ".artdeco-dropdown__content, .artdeco-dropdown__item")), timeout=3)
                             
-                            if dropdown_connect:
-                                print(f"   🔗 Found Connect in dropdown...")
-                                self.driver.execute_script("arguments[0].click();", dropdown_connect[0])
-                                time.sleep(2)
+                            # Click Connect in the dropdown if it is there - it's a div with role="button", not a button!
+                            if self._click_first(DROPDOWN_CONNECT_SELECTOR):
+                                print(f"   🔗 Clicked Connect in dropdown...")
+                                # handle_connection_request_modal waits for the modal itself
                                 return self.handle_connection_request_modal(found_name)
                         
                         print(f"   ❌ No Connect option found for {found_name}")
@@ -407,71 +713,7 @@ class LinkedInService:
         """Conservative name matching - only matches when we're reasonably confident"""
         try:
             # Normalize names for comparison
-            extracted_lower = extracted_name.lower().strip()
-            linkedin_lower = linkedin_name.lower().strip()
-            
-            # Direct match
-            if extracted_lower == linkedin_lower:
-                return True
-            
-            # Split names into parts
-            extracted_parts = extracted_lower.split()
-            linkedin_parts = linkedin_lower.split()
-            
-            # For single word extracted names, be more conservative
-            if len(extracted_parts) == 1:
-                extracted_word = extracted_parts[0]
-                
-                # Need at least 4 characters for matching
-                if len(extracted_word) < 4:
-                    return False
-                
-                # Check for strong substring matches
-                for linkedin_part in linkedin_parts:
-                    # Must be a significant portion of either name
-                    if extracted_word in linkedin_part:
-                        # Extracted name should be at least 60% of LinkedIn name part
-                        if len(extracted_word) >= len(linkedin_part) * 0.6:
-                            return True
-                    elif linkedin_part in extracted_word:
-                        # LinkedIn part should be at least 60% of extracted name
-                        if len(linkedin_part) >= len(extracted_word) * 0.6:
-                            return True
-                    
-                    # Special case: common name abbreviations
-                    abbreviations = {
-                        'mike': 'michael',
-                        'mike': 'mikhail', 
-                        'bob': 'robert',
-                        'jim': 'james',
-                        'bill': 'william',
-                        'dave': 'david',
-                        'steve': 'steven',
-                        'chris': 'christopher',
-                        'matt': 'matthew',
-                        'alex': 'alexander'
-                    }
-                    
-                    if extracted_word in abbreviations:
-                        if abbreviations[extracted_word] in linkedin_part:
-                            return True
-                    
-                    # Reverse lookup for abbreviations
-                    for abbrev, full_name in abbreviations.items():
-                        if full_name == extracted_word and abbrev in linkedin_part:
-                            return True
-                            
-                return False
-            
-            # For multi-part names, use the original logic
-            if len(extracted_parts) >= 2 and len(linkedin_parts) >= 2:
-                # Check if first and last names match (allowing for middle names, etc.)
-                first_match = any(extracted_parts[0] in part or part in extracted_parts[0] for part in linkedin_parts)
-                last_match = any(extracted_parts[-1] in part or part in extracted_parts[-1] for part in linkedin_parts)
-                return first_match and last_match
-            
-            return False
-            
+            return _names_match(extracted_name.lower().strip(), linkedin_name.lower().strip())
         except Exception as e:
             print(f"   ⚠️ Error in name matching: {e}")
             return False
@@ -480,31 +722,18 @@ class LinkedInService:
         """Handle the connection request modal that appears after clicking Connect"""
         try:
             # Wait for modal to appear
-            time.sleep(2)
+            self._wait_until(EC.presence_of_element_located((By.CSS_SELECTOR, MODAL_SELECTOR)), timeout=5)
             
-            # Look for "Send without a note" button (most common)
-            send_buttons = self.driver.find_elements(By.XPATH, 
-                "//button[contains(text(), 'Send without a note') or contains(@aria-label, 'Send without a note')]")
-            
-            if send_buttons:
-                self.driver.execute_script("arguments[0].click();", send_buttons[0])
-                print("   ✅ Sent connection without note")
-                return True
-            
-            # Look for "Send now" button
-            send_now_buttons = self.driver.find_elements(By.XPATH,
-                "//button[contains(text(), 'Send now') or contains(@aria-label, 'Send now')]")
-            
-            if send_now_buttons:
-                self.driver.execute_script("arguments[0].click();", send_now_buttons[0])
-                print("   ✅ Sent connection request")
-                return True
+            # "Send without a note" (most common), then "Send now", then any "Send" button
+            match = self._first_match(SEND_BUTTON_SELECTORS)
             
-            # Look for generic "Send" button
-            send_generic = self.driver.find_elements(By.XPATH, "//button[contains(text(), 'Send')]")
-            if send_generic:
-                self.driver.execute_script("arguments[0].click();", send_generic[0])
-                print("   ✅ Sent connection request")
+            if match:
+                selector, send_button = match
+                self.driver.execute_script("arguments[0].click();", send_button)
+                if selector == SEND_WITHOUT_NOTE_SELECTOR:
+                    print("   ✅ Sent connection without note")
+                else:
+                    print("   ✅ Sent connection request")
                 return True
             
             print("   ❌ Could not find Send button in modal")
@@ -517,36 +746,23 @@ class LinkedInService:
     def connect_from_profile_page(self, person_name):
         """Try to connect from the person's profile page"""
         try:
-            # Look for Connect button on profile page
-            connect_buttons = self.driver.find_elements(By.XPATH,
-                "//button[contains(text(), 'Connect') or contains(@aria-label, 'Connect')]")
-            
-            if connect_buttons:
-                print(f"   🔗 Found Connect button on profile page")
-                self.driver.execute_script("arguments[0].click();", connect_buttons[0])
-                time.sleep(2)
+            # Click the Connect button on the profile page if there is one
+            if self._click_first(CONNECT_BUTTON_SELECTOR):
+                print(f"   🔗 Clicked Connect button on profile page")
                 
-                # Handle the modal
+                # Handle the modal (waits for it to appear)
                 if self.handle_connection_modal():
                     return True
             
             # Look for "More" button that might reveal Connect option
-            more_buttons = self.driver.find_elements(By.XPATH,
-                "//button[contains(text(), 'More') or contains(@aria-label, 'More')]")
-            
-            if more_buttons:
-                print(f"   📋 Found More button, clicking to reveal options...")
-                self.driver.execute_script("arguments[0].click();", more_buttons[0])
-                time.sleep(2)
-                
-                # Now look for Connect in dropdown
-                dropdown_connect = self.driver.find_elements(By.XPATH,
-                    "//button[contains(text(), 'Connect') or contains(@aria-label, 'Connect')]")
+            if self._click_first("button[aria-label*='More' i]"):
+                print(f"   📋 Clicked More button to reveal options...")
+                self._wait_until(EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, ".artdeco-dropdown__content, .artdeco-dropdown__item")), timeout=3)
                 
-                if dropdown_connect:
-                    print(f"   🔗 Found Connect in More dropdown")
-                    self.driver.execute_script("arguments[0].click();", dropdown_connect[0])
-                    time.sleep(2)
+                # Now click Connect in the dropdown
+                if self._click_first(CONNECT_BUTTON_SELECTOR):
+                    print(f"   🔗 Clicked Connect in More dropdown")
                     
                     if self.handle_connection_modal():
                         return True
@@ -563,9 +779,8 @@ class LinkedInService:
         try:
             print(f"   🔗 Clicking Connect button...")
             self.driver.execute_script("arguments[0].click();", connect_button)
-            time.sleep(2)
             
-            # Use the new modal handler
+            # Use the new modal handler (waits for the modal to appear)
             return self.handle_connection_request_modal(person_name)
             
         except Exception as e:
@@ -577,64 +792,29 @@ class LinkedInService:
         try:
             print(f"   🌐 Visiting profile: {profile_url}")
             self.driver.get(profile_url)
-            time.sleep(3)
-            
-            # Look for Connect button on profile page
-            connect_buttons = self.driver.find_elements(By.XPATH, 
-                "//button[contains(text(), 'Connect') or contains(@aria-label, 'Connect')]")
+            self._wait_until(EC.presence_of_element_located((By.CSS_SELECTOR, "main button")))
             
-            if connect_buttons:
-                return self.send_connection_request(connect_buttons[0], person_name)
+            # Click the Connect button on the profile page if there is one
+            if self._click_first(CONNECT_BUTTON_SELECTOR):
+                print(f"   🔗 Clicked Connect button...")
+                return self.handle_connection_request_modal(person_name)
             
             # Look for "More" button on profile - try multiple selectors
-            more_buttons = self.driver.find_elements(By.XPATH, 
-                "//button[contains(@aria-label, 'More actions') or contains(text(), 'More')]")
-            
-            # Also try the specific class we found in debugging
-            if not more_buttons:
-                more_buttons = self.driver.find_elements(By.CSS_SELECTOR, 
-                    "button.artdeco-dropdown__trigger")
+            more_buttons = self.driver.find_elements(By.CSS_SELECTOR, MORE_BUTTON_SELECTOR)
             
             if more_buttons:
                 print(f"   ⚙️ Clicking More actions on profile...")
                 # Scroll into view first
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", more_buttons[0])
-                time.sleep(1)
                 
-                # Click the More button
+                # Click the More button and give the dropdown time to appear
                 self.driver.execute_script("arguments[0].click();", more_buttons[0])
-                time.sleep(2)  # Give dropdown time to appear
+                self._wait_until(EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, ".artdeco-dropdown__content, .artdeco-dropdown__item")), timeout=3)
                 
-                # Look for Connect in dropdown - it's a div with role="button", not a button!
-                dropdown_selectors = [
-                    "div[role='button'][aria-label*='connect' i]",
-                    ".artdeco-dropdown__item[aria-label*='connect' i]",
-                    "//div[@role='button'][contains(@aria-label, 'connect')]",
-                    "//div[contains(@class, 'artdeco-dropdown__item')][contains(@aria-label, 'connect')]",
-                    "//div[@role='button'][contains(text(), 'Connect')]",
-                    "//div[contains(@class, 'artdeco-dropdown__item')][contains(text(), 'Connect')]"
-                ]
-                
-                dropdown_connect = None
-                for selector in dropdown_selectors:
-                    try:
-                        if selector.startswith("//"):
-                            # XPath selector
-                            dropdown_connect = self.driver.find_elements(By.XPATH, selector)
-                        else:
-                            # CSS selector
-                            dropdown_connect = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        
-                        if dropdown_connect:
-                            print(f"   ✅ Found Connect in dropdown with selector: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if dropdown_connect and len(dropdown_connect) > 0:
-                    print(f"   🔗 Clicking Connect from More dropdown...")
-                    self.driver.execute_script("arguments[0].click();", dropdown_connect[0])
-                    time.sleep(2)
+                # Click Connect in the dropdown - it's a div with role="button", not a button!
+                if self._click_first(DROPDOWN_CONNECT_SELECTOR):
+                    print(f"   🔗 Clicked Connect from More dropdown...")
                     return self.handle_connection_request_modal(person_name)
                 else:
                     print(f"   ❌ Connect option not found in More dropdown")
@@ -649,48 +829,25 @@ class LinkedInService:
     def handle_connection_request_modal(self, person_name):
         """Handle the connection request modal that appears after clicking Connect"""
         try:
-            # Wait for modal to appear
-            modal_wait = WebDriverWait(self.driver, 5)
-            
-            # Look for connection modal
-            modal_selectors = [
-                ".artdeco-modal",
-                "[role='dialog']",
-                ".send-invite-modal",
-                ".connect-modal"
-            ]
-            
-            modal = None
-            for selector in modal_selectors:
-                try:
-                    modal = modal_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    print(f"   ✅ Connection modal found with selector: {selector}")
-                    break
-                except:
-                    continue
+            # Wait for any of the connection modal variants
+            modal = self._wait_until(EC.presence_of_element_located((By.CSS_SELECTOR, MODAL_SELECTOR)), timeout=5)
             
             if modal:
+                print(f"   ✅ Connection modal found")
                 # Look for "Send" or "Connect" button in modal
-                send_buttons = self.driver.find_elements(By.XPATH, 
-                    "//button[contains(text(), 'Send') or contains(text(), 'Connect') or contains(@aria-label, 'Send')]")
+                send_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[aria-label*='Send' i]")
                 
                 if send_buttons:
                     print(f"   📤 Sending connection request to {person_name}...")
                     send_buttons[0].click()
-                    time.sleep(2)
+                    # The modal closes once the invitation is submitted
+                    self._wait_until(EC.invisibility_of_element(modal), timeout=5)
                     
-                    # Check for success indicators
-                    success_indicators = [
-                        "Invitation sent",
-                        "Connection request sent", 
-                        "Pending"
-                    ]
-                    
-                    page_text = self.driver.page_source.lower()
-                    for indicator in success_indicators:
-                        if indicator.lower() in page_text:
-                            print(f"   ✅ Connection request sent successfully to {person_name}")
-                            return True
+                    # Check the confirmation toast rather than the whole page source
+                    toast_text = self.driver.execute_script(TOAST_TEXT_SCRIPT, TOAST_SELECTOR)
+                    if _SUCCESS_RE.search(toast_text or ''):
+                        print(f"   ✅ Connection request sent successfully to {person_name}")
+                        return True
                     
                     print(f"   ✅ Connection request likely sent to {person_name}")
                     return True
@@ -708,12 +865,9 @@ class LinkedInService:
     def close_modal(self):
         """Close any open modal dialogs"""
         try:
-            close_buttons = self.driver.find_elements(By.CSS_SELECTOR, 
-                "[aria-label='Dismiss'], .artdeco-modal__dismiss, [data-control-name='overlay.close_conversation_window']")
-            
-            if close_buttons:
-                close_buttons[0].click()
-                time.sleep(1)
+            dismiss_selector = "[aria-label='Dismiss'], .artdeco-modal__dismiss, [data-control-name='overlay.close_conversation_window']"
+            if self._click_first(dismiss_selector):
+                self._wait_until(EC.invisibility_of_element_located((By.CSS_SELECTOR, dismiss_selector)), timeout=3)
         except Exception as e:
             return None
     
@@ -730,25 +884,49 @@ class LinkedInService:
             options.add_experimental_option('useAutomationExtension', False)
             
             # Add realistic user agent
-            options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+            options.add_argument(f'--user-agent={HTTP_USER_AGENT}')
             
             # Standard options
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--start-maximized')
+            if self.headless:
+                options.add_argument('--headless=new')
+                options.add_argument('--window-size=1920,1080')
+            else:
+                options.add_argument('--start-maximized')
             options.add_argument('--disable-logging')
             options.add_argument('--log-level=3')
             options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            
+
+            # Automation only reads text, labels and hrefs: skip images and
+            # return from driver.get once the DOM is ready
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            })
+            options.page_load_strategy = 'eager'
+
             # Use persistent profile (should be same as email scraper if we want shared sessions)
-            profile_path = os.path.join(os.getcwd(), "chrome_profile_linkedin")
+            profile_path = os.path.join(os.getcwd(), self.profile_name)
             options.add_argument(f'--user-data-dir={profile_path}')
             
-            service = ChromeService(ChromeDriverManager().install())
+            driver_path = self._chromedriver_path()
+            # With no path, Selenium 4.6+ resolves a matching driver itself
+            service = ChromeService(driver_path) if driver_path else ChromeService()
             self.driver = webdriver.Chrome(service=service, options=options)
             
+            # Drop unneeded downloads before any navigation
+            try:
+                self.driver.execute_cdp_cmd("Network.enable", {})
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                print(f"⚠️ Could not set blocked URLs: {e}")
+            
             # Execute script to hide automation detection
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.wait = WebDriverWait(self.driver, 10, poll_frequency=0.25)
+            # Leave room for _wait_for_selector's own in-page timeout
+            self.driver.set_script_timeout(30)
             
             print("✅ LinkedIn browser started successfully")
             return True
@@ -765,51 +943,38 @@ class LinkedInService:
         connections_sent = 0
         people_found = []
         
-        if not self.start_browser():
+        if not self.ensure_browser():
             return []
         
         try:
-            # Go to LinkedIn and check if logged in
-            self.driver.get("https://www.linkedin.com")
-            time.sleep(3)
-            
-            # Check if we need to login
-            if "feed" not in self.driver.current_url and "in/m" not in self.driver.current_url:
-                print("❗ LinkedIn login required")
-                print("   Please log in manually and then press Enter...")
-                input("   >>> After logging in, press Enter to continue <<<")
+            # Check the login on a browser taken from the pool, so another campaign's search isn't navigated away
+            pool = self._worker_pool()
+            service = pool.get()
+            try:
+                service._check_feed_login()
+            finally:
+                pool.put(service)
             
+            prepared = []
             for email in email_list[:10]:  # Process first 10 emails
-                if connections_sent >= max_connections:
-                    break
-                    
+                if isinstance(email, str) and email.lower() in self.connected_profiles:
+                    print(f"   ⏭️ Skipping {email} (already contacted)")
+                    continue
                 # Extract name from email
                 person_name = self.extract_name_from_email(email)
                 if not person_name:
                     print(f"   ❌ Could not extract name from {email}")
                     continue
-                
-                print(f"\n🔍 Searching for: {person_name} at {company_name}")
-                
-                # Search on LinkedIn
-                search_query = f"{person_name} {company_name}"
-                result = self.search_and_connect(search_query, person_name, email)
-                
-                if result:
-                    people_found.append({
-                        'email': email,
-                        'name': person_name,
-                        'linkedin_url': result.get('profile_url'),
-                        'connected': result.get('connected', False)
-                    })
-                    
-                    if result.get('connected'):
-                        connections_sent += 1
-                        print(f"✅ Connection sent to {person_name}")
-                        time.sleep(5)  # Wait between connections
-                    
-                # Wait between searches to avoid rate limiting
-                time.sleep(3)
+                prepared.append((email, person_name))
+            
+            # Each worker browser takes the next email; the connection cap is shared by this run's
+            # workers only, so campaigns running side by side keep their own counts
+            counts = {'sent': 0, 'in_flight': 0}
+            find = partial(self._find_person, company_name=company_name, max_connections=max_connections,
+                           counts=counts, cond=threading.Condition())
+            with ThreadPoolExecutor(max_workers=pool.qsize()) as executor:
+                people_found = [person for person in executor.map(find, prepared) if person]
+            connections_sent = counts['sent']
                 
         except Exception as e:
             print(f"❌ LinkedIn automation error: {e}")
@@ -820,64 +985,155 @@ class LinkedInService:
         
         return people_found
     
-    def search_and_connect(self, search_query, person_name, email):
-        """Search for a specific person and attempt to connect"""
+    def _check_feed_login(self):
+        """Open LinkedIn and ask for a manual login if the session isn't on the feed"""
+        self.driver.get("https://www.linkedin.com")
+        self._wait_until(EC.any_of(
+            EC.url_contains("feed"),
+            EC.presence_of_element_located((By.ID, "username")),
+            EC.presence_of_element_located((By.CSS_SELECTOR, ".global-nav__me"))
+        ))
+        
+        # Check if we need to login
+        if "feed" not in self.driver.current_url and "in/m" not in self.driver.current_url:
+            print("❗ LinkedIn login required")
+            print("   Please log in manually and then press Enter...")
+            input("   >>> After logging in, press Enter to continue <<<")
+    
+    def _find_person(self, prepared, company_name, max_connections, counts, cond):
+        """Look one (email, name) pair up on a free worker browser; None if not found or the cap is reached.
+        counts ({'sent', 'in_flight'}) and cond are shared by the workers of one search_people_by_emails run."""
+        email, person_name = prepared
+        with cond:
+            # Only start if the lookups already running can't fill the cap on their own
+            while counts['in_flight'] and counts['sent'] + counts['in_flight'] >= max_connections:
+                cond.wait()
+            if counts['sent'] >= max_connections:
+                return None
+            counts['in_flight'] += 1
+        
+        service = self._driver_pool.get()
         try:
-            # Go to LinkedIn search
-            encoded_query = quote(search_query)
-            search_url = f"https://www.linkedin.com/search/results/people/?keywords={encoded_query}"
+            print(f"\n🔍 Searching for: {person_name} at {company_name}")
             
-            self.driver.get(search_url)
+            # Search on LinkedIn
+            search_query = f"{person_name} {company_name}"
+            result = None
+            try:
+                result = service.search_and_connect(search_query, person_name, email)
+            finally:
+                with cond:
+                    counts['in_flight'] -= 1
+                    if result and result.get('connected'):
+                        counts['sent'] += 1
+                    cond.notify_all()
+            
+            person = None
+            if result:
+                person = {
+                    'email': email,
+                    'name': person_name,
+                    'linkedin_url': result.get('profile_url'),
+                    'connected': result.get('connected', False)
+                }
+                
+                if result.get('connected'):
+                    print(f"✅ Connection sent to {person_name}")
+                    self._remember_contact(email.lower())
+                    if result.get('profile_url'):
+                        self._remember_contact(result['profile_url'])
+                    time.sleep(5)  # Wait between connections (per worker)
+            
+            # Wait between searches to avoid rate limiting
             time.sleep(3)
+            return person
+        finally:
+            self._driver_pool.put(service)
+    
+    def search_and_connect(self, search_query, person_name, email):
+        """Search for a specific person and attempt to connect"""
+        try:
+            # Resolve profiles over the JSON API when possible, skipping the search page load
+            results = self._voyager_search_people(search_query)
+            if results is not None:
+                result_count = len(results)
+            else:
+                # Go to LinkedIn search
+                encoded_query = quote(search_query)
+                search_url = f"https://www.linkedin.com/search/results/people/?keywords={encoded_query}"
+                
+                self.driver.get(search_url)
+                self._wait_until(EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, f".search-results-container, .reusable-search__result-container, {NO_RESULTS_SELECTOR}")))
+                
+                # Read the first results' names and profile links in a single script call
+                result_count, results = self.driver.execute_script(
+                    CARD_SUMMARY_SCRIPT, ".reusable-search__result-container",
+                    ".entity-result__title-text a span[aria-hidden='true']", "a.app-aware-link", MORE_BUTTON_SELECTOR, 3)
             
-            # Look for search results
-            results = self.driver.find_elements(By.CSS_SELECTOR, ".reusable-search__result-container")
-            
-            if not results:
+            if not result_count:
                 print(f"   ❌ No search results found for {person_name}")
                 return None
                 
-            # Check first few results for exact name match
-            for result in results[:3]:
-                try:
-                    # Get profile link and name
-                    profile_link = result.find_element(By.CSS_SELECTOR, "a.app-aware-link")
-                    profile_url = profile_link.get_attribute('href')
-                    
-                    # Get name from result
-                    name_element = result.find_element(By.CSS_SELECTOR, ".entity-result__title-text a span[aria-hidden='true']")
-                    result_name = name_element.text.strip()
-                    
-                    print(f"   🔍 Found: {result_name}")
-                    
-                    # Click on profile
-                    self.driver.execute_script("arguments[0].click();", profile_link)
-                    time.sleep(3)
+            # Rank the first few results by name and only open the best match
+            best = self._best_candidate(person_name, results)
+            if not best:
+                print(f"   ❌ No result close enough to {person_name}")
+                return None
+            
+            profile_url, result_name = best['url'], best['name']
+            print(f"   🔍 Found: {result_name}")
+            
+            try:
+                if self._connection_distance(profile_url) == 'DISTANCE_1':
+                    print(f"   - Already connected")
+                    return {'profile_url': profile_url, 'name': result_name, 'connected': False}
+                
+                connected = self._connect_via_overlay(profile_url)
+                if connected is None:
+                    # Open the profile
+                    self.driver.get(profile_url)
                     
-                    # Try to connect
+                    # Try to connect (waits for the profile page to load)
                     connected = self.attempt_connection()
-                    
-                    return {
-                        'profile_url': profile_url,
-                        'name': result_name,
-                        'connected': connected
-                    }
-                    
-                except Exception as e:
-                    print(f"   ❌ Error processing result: {e}")
-                    continue
-            
-            return None
+                
+                return {
+                    'profile_url': profile_url,
+                    'name': result_name,
+                    'connected': connected
+                }
+                
+            except Exception as e:
+                print(f"   ❌ Error processing result: {e}")
+                return None
             
         except Exception as e:
             print(f"   ❌ Search failed for {person_name}: {e}")
             return None
     
+    def _best_candidate(self, person_name, results):
+        """The result whose name is most similar to person_name, or None if none is close enough"""
+        best, best_score = None, 0
+        for result in results:
+            if not result['url'] or not result['name']:
+                continue
+            score = _name_similarity(person_name, result['name'])
+            # Nicknames and single-word names that names_match accepts still qualify
+            if self.names_match(person_name, result['name']):
+                score = max(score, NAME_MATCH_THRESHOLD)
+            if score >= NAME_MATCH_THRESHOLD and score > best_score:
+                best, best_score = result, score
+        return best
+    
     def linkedin_login(self):
         """Login to LinkedIn with session persistence"""
         try:
             self.driver.get("https://www.linkedin.com/login")
-            time.sleep(3)
+            self._wait_until(EC.any_of(
+                EC.url_contains("feed"),
+                EC.url_contains("mynetwork"),
+                EC.presence_of_element_located((By.ID, "username"))
+            ))
             
             # Check if already logged in
             if "feed" in self.driver.current_url or "mynetwork" in self.driver.current_url:
@@ -898,10 +1154,18 @@ class LinkedInService:
             login_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
             login_button.click()
             
-            # Wait for login to complete
-            WebDriverWait(self.driver, 15).until(
-                lambda driver: "feed" in driver.current_url or "mynetwork" in driver.current_url
-            )
+            # Wait for the feed, a security checkpoint or a credential error, whichever comes first
+            WebDriverWait(self.driver, 15).until(EC.any_of(
+                EC.url_contains("feed"),
+                EC.url_contains("mynetwork"),
+                EC.url_contains("checkpoint"),
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#error-for-username, #error-for-password"))
+            ))
+            
+            current_url = self.driver.current_url
+            if "feed" not in current_url and "mynetwork" not in current_url:
+                print("❌ LinkedIn login needs attention (checkpoint or wrong credentials)")
+                return False
             
             print("✅ LinkedIn login successful")
             return True
@@ -910,24 +1174,164 @@ class LinkedInService:
             print(f"❌ LinkedIn login failed: {e}")
             return False
     
+    def _voyager_headers(self):
+        """Copy the browser's LinkedIn cookies into the HTTP session; Voyager headers, or None without a login"""
+        if self._voyager is None:
+            cookies = {c['name']: c['value'] for c in self.driver.get_cookies()}
+            if 'li_at' not in cookies or 'JSESSIONID' not in cookies:
+                return None
+            for name, value in cookies.items():
+                self._http.cookies.set(name, value, domain='.linkedin.com')
+            self._voyager = {
+                'csrf-token': cookies['JSESSIONID'].strip('"'),
+                'x-restli-protocol-version': '2.0.0',
+                'accept': 'application/json',
+            }
+        return self._voyager
+    
+    def _connection_distance(self, profile_url):
+        """Network distance for a profile ('DISTANCE_1' = already connected), or None if unknown"""
+        path = urlparse(profile_url).path.strip('/').split('/')
+        if len(path) < 2 or path[0] != 'in':
+            return None
+        try:
+            headers = self._voyager_headers()
+            if headers is None:
+                return None
+            response = self._http.get(f"{VOYAGER_API_URL}/identity/profiles/{path[1]}/networkinfo",
+                                      headers=headers, timeout=10)
+            if response.status_code in (401, 403):
+                self._voyager = None
+                return None
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            return (data.get('data', data).get('distance') or {}).get('value')
+        except Exception:
+            return None
+    
+    def _voyager_search_people(self, search_query, count=3):
+        """First people hits as [{'name', 'url'}] from Voyager's search, or None to use the search page"""
+        try:
+            headers = self._voyager_headers()
+            if headers is None:
+                return None
+            response = self._http.get(f"{VOYAGER_API_URL}/search/blended", headers=headers, params={
+                'keywords': search_query,
+                'count': count,
+                'origin': 'GLOBAL_SEARCH_HEADER',
+                'q': 'all',
+                'filters': 'List(resultType->PEOPLE)',
+            }, timeout=10)
+            if response.status_code in (401, 403):
+                self._voyager = None
+                return None
+            if response.status_code != 200:
+                return None
+            
+            people = []
+            for cluster in response.json().get('data', {}).get('elements', []):
+                for hit in cluster.get('elements', []):
+                    profile = (hit.get('hitInfo') or {}).get('com.linkedin.voyager.search.SearchProfile') or {}
+                    mini = profile.get('miniProfile') or {}
+                    public_id = mini.get('publicIdentifier') or profile.get('publicIdentifier')
+                    if public_id:
+                        name = f"{mini.get('firstName', '')} {mini.get('lastName', '')}".strip()
+                        people.append({'name': name, 'url': f"https://www.linkedin.com/in/{public_id}/"})
+            # An empty list may just mean the response shape changed; let the page decide
+            return people[:count] or None
+        except Exception:
+            return None
+    
+    def _company_page_cache(self):
+        """Company people pages found on earlier runs, loaded on first use"""
+        if self._company_pages is None:
+            self._company_pages = {}
+            try:
+                with open(COMPANY_PAGES_FILE, 'r', encoding='utf-8') as f:
+                    self._company_pages = json.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"⚠️ Could not load company page cache: {e}")
+        return self._company_pages
+    
+    def _save_company_page(self, key, people_url):
+        cache = self._company_page_cache()
+        cache[key] = people_url
+        try:
+            tmp_file = COMPANY_PAGES_FILE + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, COMPANY_PAGES_FILE)
+        except Exception as e:
+            print(f"⚠️ Could not save company page cache: {e}")
+    
+    def _company_page_over_http(self, company_name):
+        """(company page URL, guessed) found without the browser: guessed slug first, then DuckDuckGo's HTML results.
+        guessed is True for a slug hit, which is only trusted for the current run."""
+        slug = re.sub(r'[^a-z0-9]+', '-', company_name.lower()).strip('-')
+        try:
+            # Logged-in cookies keep LinkedIn from answering with its auth wall
+            if self.driver:
+                self._voyager_headers()
+            response = self._http.get(f"https://www.linkedin.com/company/{slug}/", timeout=5)
+            if response.status_code == 200 and f"/company/{slug}" in response.url:
+                # The slug must belong to a page named after the company, not just exist
+                title = _PAGE_TITLE_RE.search(response.text)
+                page_name = (title.group(1) or title.group(2)) if title else ''
+                if company_name.lower() in page_name.lower():
+                    return f"https://www.linkedin.com/company/{slug}/", True
+        except Exception:
+            pass
+        
+        try:
+            response = self._http.get(DUCKDUCKGO_HTML_URL, params={'q': f"{company_name} site:linkedin.com/company"},
+                                      timeout=10)
+            match = _COMPANY_URL_RE.search(unquote(response.text))
+            if match:
+                return f"https://www.linkedin.com/company/{match.group(1)}/", False
+        except Exception as e:
+            print(f"⚠️ DuckDuckGo lookup failed: {e}")
+        return None, False
+    
     def find_company_people_page(self, company_name):
         """Find company's LinkedIn people page via Google search"""
         try:
+            key = company_name.lower().strip()
+            cached = self._company_page_cache().get(key) or self._guessed_pages.get(key)
+            if cached:
+                print(f"✅ Using cached people page: {cached}")
+                return cached
+            
             print(f"🔎 Finding LinkedIn page for '{company_name}'...")
             
+            company_url, guessed = self._company_page_over_http(company_name)
+            if company_url:
+                people_url = company_url.rstrip('/') + "/people/"
+                print(f"✅ Found people page: {people_url}")
+                if guessed:
+                    self._guessed_pages[key] = people_url
+                else:
+                    self._save_company_page(key, people_url)
+                return people_url
+            
             # Google search for company LinkedIn page
             encoded_query = quote(f"{company_name} site:linkedin.com/company")
             search_url = f"https://www.google.com/search?q={encoded_query}"
             
             self.driver.get(search_url)
-            time.sleep(3)
             
-            # Handle potential CAPTCHA
-            try:
-                first_result = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#search a"))
-                )
-            except TimeoutException:
+            # Results or Google's CAPTCHA interstitial, whichever shows up first
+            self._wait_until(EC.any_of(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#search a")),
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#captcha-form, form[action*='sorry']")),
+                EC.url_contains("/sorry/")
+            ), timeout=10)
+            results = self.driver.find_elements(By.CSS_SELECTOR, "#search a")
+            if results:
+                first_result = results[0]
+            else:
                 print("❗ Google CAPTCHA detected. Please solve manually...")
                 input("Press Enter after solving CAPTCHA...")
                 first_result = WebDriverWait(self.driver, 60).until(
@@ -943,6 +1347,7 @@ class LinkedInService:
             # Convert to people page URL
             people_url = company_url.split('?')[0].strip('/') + "/people/"
             print(f"✅ Found people page: {people_url}")
+            self._save_company_page(key, people_url)
             return people_url
             
         except Exception as e:
@@ -955,7 +1360,6 @@ class LinkedInService:
         
         try:
             self.driver.get(people_url)
-            time.sleep(3)
             
             # Search for different roles
             search_keywords = ["Software Engineer", "Recruiter", "Talent Acquisition"]
@@ -973,11 +1377,16 @@ class LinkedInService:
                     )
                     search_input.clear()
                     search_input.send_keys(keyword)
+                    # Cards from the previous keyword (or the default list) are replaced by the search
+                    old_cards = self.driver.find_elements(By.CSS_SELECTOR, PEOPLE_CARD_SELECTOR)
                     search_input.send_keys(Keys.RETURN)
-                    time.sleep(3)
+                    if old_cards:
+                        self._wait_until(EC.staleness_of(old_cards[0]), timeout=10)
+                    self._wait_until(EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, f"{PEOPLE_CARD_SELECTOR}, {NO_RESULTS_SELECTOR}")))
                     
                     # Get profile cards
-                    profile_cards = self.driver.find_elements(By.CSS_SELECTOR, "li.org-people-profile-card__profile-card-spacing")
+                    profile_cards = self.driver.find_elements(By.CSS_SELECTOR, PEOPLE_CARD_SELECTOR)
                     
                     # Process each profile
                     for card in profile_cards[:3]:  # Limit per keyword
@@ -989,16 +1398,24 @@ class LinkedInService:
                             link_element = card.find_element(By.CSS_SELECTOR, "a.link-without-visited-state")
                             profile_url = link_element.get_attribute('href')
                             
-                            if profile_url in self.connected_profiles:
+                            # Check and mark in one step, so two threads can't both take the same profile
+                            if not self._claim_profile(profile_url):
                                 continue
                             
-                            # Visit profile and attempt connection
-                            print(f"   Visiting profile...")
-                            self.driver.get(profile_url)
-                            self.connected_profiles.add(profile_url)
-                            time.sleep(2)
+                            # Skip existing connections without loading their profile
+                            if self._connection_distance(profile_url) == 'DISTANCE_1':
+                                print(f"   - Already connected")
+                                continue
                             
-                            if self.attempt_connection():
+                            connected = self._connect_via_overlay(profile_url)
+                            if connected is None:
+                                # Visit profile and attempt connection
+                                print(f"   Visiting profile...")
+                                self.driver.get(profile_url)
+                                connected = self.attempt_connection()
+                            
+                            if connected:
+                                self._remember_contact(profile_url)
                                 connections_sent += 1
                                 print(f"   ✅ Connection sent ({connections_sent}/{max_connections})")
                             
@@ -1020,48 +1437,26 @@ class LinkedInService:
     def attempt_connection(self):
         """Attempt to send connection request"""
         try:
-            # Wait for page to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "main"))
-            )
-            time.sleep(2)
+            # Wait for the profile's action buttons, which render after the main shell
+            if not self._wait_until(EC.presence_of_element_located((By.CSS_SELECTOR, "main button"))):
+                print("   - Profile page did not load")
+                return False
             
             # Check if already connected/pending
-            if self.driver.find_elements(By.XPATH, "//button[contains(@aria-label, 'Pending')]"):
+            if self.driver.execute_script("return !!document.querySelector(arguments[0]);", "button[aria-label*='Pending' i]"):
                 print("   - Already pending")
                 return False
             
-            # Look for Connect button
-            connect_buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(), 'Connect')]")
-            
-            for button in connect_buttons:
-                try:
-                    aria_label = button.get_attribute('aria-label') or ''
-                    if 'invite' in aria_label.lower():
-                        self.driver.execute_script("arguments[0].click();", button)
-                        time.sleep(1)
-                        
-                        # Click "Send without a note"
-                        send_selectors = [
-                            "//button[@aria-label='Send without a note']",
-                            "//button[contains(@aria-label, 'Send without')]",
-                            "//button[contains(text(), 'Send without a note')]"
-                        ]
-                        
-                        for selector in send_selectors:
-                            try:
-                                send_button = WebDriverWait(self.driver, 3).until(
-                                    EC.element_to_be_clickable((By.XPATH, selector))
-                                )
-                                send_button.click()
-                                return True
-                            except:
-                                continue
-                        
-                        return False
-                        
-                except Exception as e:
-                    continue
+            # The profile's own "Invite X to connect" button, matched on both words by the CSS engine
+            if self._click_first(INVITE_BUTTON_SELECTOR):
+                # Click "Send without a note" once the modal shows it
+                send_button = self._wait_until(EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, SEND_WITHOUT_NOTE_SELECTOR)), timeout=3)
+                if send_button:
+                    send_button.click()
+                    return True
+                
+                return False
             
             print("   - No Connect button found")
             return False
@@ -1070,6 +1465,37 @@ class LinkedInService:
             print(f"   - Connection attempt failed: {str(e)[:50]}...")
             return False
     
+    def _connect_via_overlay(self, profile_url):
+        """Open a profile's connect form directly and send without a note.
+        True once LinkedIn confirms the invite, False if it doesn't,
+        None when the overlay didn't open and the profile page should be used."""
+        with self._overlay_lock:
+            if self._overlay_misses >= OVERLAY_MISS_LIMIT:
+                return None
+        path = urlparse(profile_url).path.strip('/').split('/')
+        if len(path) < 2 or path[0] != 'in':
+            return None
+        
+        self.driver.get(f"https://www.linkedin.com/in/{path[1]}/{CONNECT_OVERLAY_PATH}")
+        send_button = self._wait_until(EC.element_to_be_clickable((By.CSS_SELECTOR, SEND_WITHOUT_NOTE_SELECTOR)), timeout=5)
+        with self._overlay_lock:
+            if not send_button:
+                self._overlay_misses += 1
+                if self._overlay_misses == OVERLAY_MISS_LIMIT:
+                    print("   ℹ️ Connect overlay not opening, using profile pages from now on")
+                return None
+            self._overlay_misses = 0
+        
+        send_button.click()
+        # Same confirmation as handle_connection_request_modal: LinkedIn's toast, not just the click
+        self._wait_until(EC.presence_of_element_located((By.CSS_SELECTOR, TOAST_SELECTOR)), timeout=5)
+        toast_text = self.driver.execute_script(TOAST_TEXT_SCRIPT, TOAST_SELECTOR)
+        if _SUCCESS_RE.search(toast_text or ''):
+            print("   ✅ Invitation sent (connect overlay)")
+            return True
+        print("   ❌ No invitation confirmation after sending from the connect overlay")
+        return False
+    
     def run_linkedin_outreach(self, company_name, max_connections=5):
         """Complete LinkedIn outreach process"""
         if not self.linkedin_email or not self.linkedin_password:
@@ -1077,7 +1503,7 @@ class LinkedInService:
             return 0
         
         try:
-            if not self.start_browser():
+            if not self.ensure_browser():
                 return 0
             
             if not self.linkedin_login():
@@ -1095,7 +1521,12 @@ class LinkedInService:
             print(f"❌ LinkedIn outreach failed: {e}")
             return 0
         finally:
-            self.close_browser()
+            # Keep the browser for the next run (close() shuts it down) but drop this run's page
+            if self.driver:
+                try:
+                    self.driver.get("about:blank")
+                except Exception:
+                    pass
     
     def close_browser(self):
         """Close browser safely"""
@@ -1104,4 +1535,17 @@ class LinkedInService:
                 print("🔴 Closing browser...")
                 self.driver.quit()
         except Exception as e:
-            print(f"❌ Error closing browser: {e}")
\ No newline at end of file
+            print(f"❌ Error closing browser: {e}")
+        finally:
+            self.driver = None
+            self.wait = None
+            self._voyager = None
+    
+    def close(self):
+        """Shut down the shared browser and any worker browsers (call once, e.g. at process exit)"""
+        for helper in self._helpers:
+            helper.close_browser()
+        self._helpers = []
+        self._driver_pool = None
+        self.close_browser()
+        self._http.close()
\ No newline at end of file
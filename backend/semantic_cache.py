@@ -0,0 +1,164 @@
+"""
+Semantic cache for generated outreach emails, keyed by job description embeddings
+"""
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+from google.genai import types
+
+try:
+    # numpy scores every cached vector in one matrix product; the pure-Python loop gives the same result
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger('outreach.semantic_cache')
+
+# Earlier versions rewrote this whole file on every store; it is imported into the database once
+LEGACY_CACHE_FILE = "semantic_cache.json"
+
+
+class SemanticCache:
+    def __init__(self, cache_path="semantic_cache.db", threshold=0.92, ttl=7 * 24 * 3600, max_entries=500,
+                 embedding_model='text-embedding-004'):
+        """Load previously cached emails so restarts don't start cold"""
+        self.cache_path = cache_path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedding_model = embedding_model
+        self._lock = threading.Lock()
+        # Row id -> (normalized embedding, email_text, timestamp), least recently used first
+        self._entries = OrderedDict()
+        # (row ids, stacked vectors) for numpy scoring, rebuilt lazily after entries are added or removed
+        self._index = None
+        self._db = None
+        self._load()
+
+    def _load(self):
+        try:
+            self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS emails (id INTEGER PRIMARY KEY, embedding BLOB, email TEXT, ts REAL)"
+            )
+            self._import_legacy()
+            now = time.time()
+            with self._db:
+                # Expired rows, and anything past max_entries from older runs
+                self._db.execute("DELETE FROM emails WHERE ts <= ?", (now - self.ttl,))
+                self._db.execute(
+                    "DELETE FROM emails WHERE id NOT IN (SELECT id FROM emails ORDER BY ts DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+            rows = self._db.execute(
+                "SELECT id, embedding, email, ts FROM emails ORDER BY ts DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            for row_id, blob, email, timestamp in reversed(rows):
+                self._entries[row_id] = (array('f', blob).tolist(), email, timestamp)
+            log.info("Loaded %d cached emails", len(self._entries))
+        except Exception as e:
+            log.warning("Could not load semantic cache: %s", e)
+
+    def _import_legacy(self):
+        if not os.path.exists(LEGACY_CACHE_FILE):
+            return
+        with open(LEGACY_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO emails (embedding, email, ts) VALUES (?, ?, ?)",
+                [(array('f', item['embedding']).tobytes(), item['email'], item['timestamp']) for item in data]
+            )
+        os.replace(LEGACY_CACHE_FILE, LEGACY_CACHE_FILE + ".imported")
+
+    def _delete(self, row_ids):
+        """Drop entries from memory and disk; call with the lock held"""
+        for row_id in row_ids:
+            self._entries.pop(row_id, None)
+        self._index = None
+        try:
+            with self._db:
+                self._db.executemany("DELETE FROM emails WHERE id = ?", [(row_id,) for row_id in row_ids])
+        except Exception as e:
+            log.warning("Could not evict from semantic cache: %s", e)
+
+    @staticmethod
+    def _normalize(vector):
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else list(vector)
+
+    def embed(self, text, client) -> List[float]:
+        """Embed text with the given client and return a unit-length vector (API errors are raised)"""
+        result = client.models.embed_content(
+            model=self.embedding_model,
+            contents=text,
+            config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY")
+        )
+        return self._normalize(result.embeddings[0].values)
+
+    def _best_match(self, embedding):
+        """(cosine similarity, row id) of the closest entry; vectors are normalized, so a dot product"""
+        if np is not None:
+            if self._index is None:
+                row_ids = list(self._entries)
+                matrix = np.array([self._entries[row_id][0] for row_id in row_ids], dtype=np.float32)
+                self._index = (row_ids, matrix)
+            row_ids, matrix = self._index
+            scores = matrix @ np.asarray(embedding, dtype=np.float32)
+            best = int(scores.argmax())
+            return float(scores[best]), row_ids[best]
+        return max((sum(a * b for a, b in zip(embedding, vector)), row_id)
+                   for row_id, (vector, _, _) in self._entries.items())
+
+    def lookup(self, embedding) -> Optional[str]:
+        """Return the cached email for the most similar description, if close enough and fresh"""
+        if embedding is None:
+            return None
+
+        with self._lock:
+            if not self._entries:
+                return None
+            expired = [row_id for row_id, (_, _, timestamp) in self._entries.items()
+                       if time.time() - timestamp >= self.ttl]
+            if expired:
+                self._delete(expired)
+                if not self._entries:
+                    return None
+
+            best_score, best_id = self._best_match(embedding)
+            if best_score <= self.threshold:
+                return None
+
+            self._entries.move_to_end(best_id)
+            log.debug("Semantic cache hit (similarity %.3f)", best_score)
+            return self._entries[best_id][1]
+
+    def store(self, embedding, email):
+        """Remember a generated email for this description embedding"""
+        if embedding is None:
+            return
+
+        with self._lock:
+            timestamp = time.time()
+            try:
+                with self._db:
+                    cursor = self._db.execute(
+                        "INSERT INTO emails (embedding, email, ts) VALUES (?, ?, ?)",
+                        (array('f', embedding).tobytes(), email, timestamp)
+                    )
+                row_id = cursor.lastrowid
+            except Exception as e:
+                log.warning("Could not persist semantic cache: %s", e)
+                row_id = -int(timestamp * 1e6)  # memory-only entry
+            self._entries[row_id] = (embedding, email, timestamp)
+            self._index = None
+            if len(self._entries) > self.max_entries:
+                self._delete(list(self._entries)[:len(self._entries) - self.max_entries])
@@ -0,0 +1,11 @@
+"""
+WSGI entrypoint for production serving
+
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 --keep-alive 75 wsgi:app
+
+Campaign state (results, id counter, browser session) lives in the process, so
+scale with threads rather than workers; extra workers would each get their own copy.
+"""
+from app import app
+
+application = app